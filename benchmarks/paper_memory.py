@@ -0,0 +1,80 @@
+"""对比 dict 记录与 PaperStore 列式存储的内存占用。
+
+用法: python benchmarks/paper_memory.py [论文数量，默认 100000]
+"""
+import gc
+import random
+import sys
+import tracemalloc
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+	sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.core.records import PaperStore
+
+
+def synthetic_papers(n, seed=0):
+	"""生成接近真实分布的论文：少量来源、重复出现的作者、约 1KB 的摘要"""
+	rng = random.Random(seed)
+	vocab = [f"w{i}" for i in range(20000)]
+	names = [f"Author{i} Surname{i % 997}" for i in range(max(1000, n // 3))]
+	sources = ["ICML", "NeurIPS", "ICLR", "arXiv", "Nature Machine Intelligence"]
+	for i in range(n):
+		yield (
+			# 模拟从网络响应中解析出来的字符串：每条记录各自持有一份
+			"".join(rng.choice(sources)),
+			rng.choice((2023, 2024, 2025)),
+			" ".join(rng.choices(vocab, k=10)),
+			["".join(rng.choice(names)) for _ in range(rng.randint(2, 8))],
+			" ".join(rng.choices(vocab, k=150)),
+			f"https://example.org/virtual/2024/poster/{i}",
+		)
+
+
+def measure(build):
+	gc.collect()
+	tracemalloc.start()
+	obj = build()
+	gc.collect()
+	current, _ = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+	return obj, current
+
+
+def build_dicts(n):
+	return [
+		{
+			"source": source,
+			"year": year,
+			"title": title,
+			"authors": ", ".join(authors),
+			"abstract": abstract,
+			"url": url,
+		}
+		for source, year, title, authors, abstract, url in synthetic_papers(n)
+	]
+
+
+def build_store(n):
+	store = PaperStore()
+	for source, year, title, authors, abstract, url in synthetic_papers(n):
+		store.append(source, year, title, authors, abstract, url, matched=True)
+	return store
+
+
+def main():
+	n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+	_, dict_bytes = measure(lambda: build_dicts(n))
+	store, store_bytes = measure(lambda: build_store(n))
+	scale = 100_000 / n
+	print(f"papers: {n}")
+	print(f"dict records : {dict_bytes * scale / 2**20:8.1f} MiB per 100k papers")
+	print(f"PaperStore   : {store_bytes * scale / 2**20:8.1f} MiB per 100k papers "
+		f"({len(store.names)} distinct authors, {len(store.sources)} sources)")
+	print(f"ratio        : {dict_bytes / store_bytes:8.2f}x smaller")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,73 @@
+"""CLI 启动耗时基准：测量 `main.py --help` 的墙钟时间与导入开销。
+
+用法: python benchmarks/startup.py [--runs 10] [--max-ms 150]
+超过 --max-ms（扣除解释器自身启动时间后）或导入了重量级依赖时以非零状态退出。
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# 仅解析参数时不应被导入的模块
+HEAVY_MODULES = ("aiohttp", "bs4", "yaml", "asyncio", "src.core.engine")
+
+
+def wall_ms(cmd, runs):
+	samples = []
+	for _ in range(runs):
+		start = time.perf_counter()
+		subprocess.run(cmd, cwd=PROJECT_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+		samples.append((time.perf_counter() - start) * 1000)
+	return statistics.median(samples)
+
+
+def import_profile(cmd):
+	"""返回 (-X importtime 的累计耗时最高的模块, 已导入的模块名集合)"""
+	env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+	proc = subprocess.run(
+		[sys.executable, "-X", "importtime", *cmd], cwd=PROJECT_ROOT,
+		stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, env=env,
+	)
+	rows = []
+	for line in proc.stderr.splitlines():
+		if not line.startswith("import time:") or "cumulative" in line:
+			continue
+		_, cumulative_us, name = line[len("import time:"):].split("|")
+		rows.append((int(cumulative_us), name.strip()))
+	modules = {name for _, name in rows}
+	return sorted(rows, reverse=True), modules
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Measure Paper-Tunneling CLI startup time")
+	parser.add_argument("--runs", type=int, default=10)
+	parser.add_argument("--max-ms", type=float, default=150.0, help="允许的启动开销上限 (毫秒)")
+	args = parser.parse_args()
+
+	baseline = wall_ms([sys.executable, "-c", "pass"], args.runs)
+	cli = wall_ms([sys.executable, "main.py", "--help"], args.runs)
+	overhead = cli - baseline
+	rows, modules = import_profile(["main.py", "--help"])
+
+	print(f"python -c pass     : {baseline:7.1f} ms (median of {args.runs})")
+	print(f"main.py --help     : {cli:7.1f} ms")
+	print(f"startup overhead   : {overhead:7.1f} ms (limit {args.max_ms:.0f} ms)")
+	print("top imports (cumulative):")
+	for cumulative_us, name in rows[:8]:
+		print(f"  {cumulative_us / 1000:7.1f} ms  {name}")
+
+	heavy = [m for m in HEAVY_MODULES if m in modules]
+	if heavy:
+		print(f"FAIL: heavy modules imported during --help: {', '.join(heavy)}")
+	if overhead > args.max_ms:
+		print("FAIL: startup overhead above limit")
+	sys.exit(1 if heavy or overhead > args.max_ms else 0)
+
+
+if __name__ == "__main__":
+	main()
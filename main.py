@@ -1,5 +1,3 @@
-import asyncio
-import yaml
 import os
 import sys
 import argparse
@@ -8,15 +6,13 @@ PROJECT_ROOT = Path(__file__).resolve().parent
 if str(PROJECT_ROOT) not in sys.path:
 	sys.path.insert(0, str(PROJECT_ROOT))
 
-from src.core.engine import CrawlerEngine
-from src.scrapers.icml import ICMLScraper
-from src.scrapers.neurips import NeurIPSScraper
-from src.scrapers.iclr import ICLRScraper
-from src.scrapers.openalex import OpenAlexScraper
-from src.scrapers.arxiv import ArxivScraper
+# 注册表只包含来源声明；aiohttp / bs4 / yaml 等重量级依赖都在需要时才导入
+from src.scrapers import registry
 
 
 def load_config(path="config.yaml"):
+	import yaml
+
 	if not os.path.exists(path):
 		raise FileNotFoundError(f"Config file not found at {path}")
 	with open(path, "r", encoding="utf-8") as f:
@@ -30,6 +26,25 @@ def parse_args():
 	parser.add_argument("--conferences", nargs="+", help="会议列表，例如: icml")
 	parser.add_argument("--journals", nargs="+", help="期刊列表，例如: nmi")
 	parser.add_argument("--concurrency", type=int, help="并发请求数，例如: 5")
+	parser.add_argument("--top-k", type=int, help="只导出 BM25 得分最高的 N 篇命中论文，例如: 50")
+	parser.add_argument("--jsonl", metavar="PATH", help="按得分排序把结果（含 score）写成 JSON Lines 文件")
+	parser.add_argument("--enrich", action="store_true", help="通过 OpenAlex 批量补全会议/arXiv 命中论文的引用数、DOI 与 OpenAlex ID")
+	parser.add_argument("--download-pdfs", action="store_true", help="下载导出论文的 PDF（并发、可续传、按内容去重）")
+	parser.add_argument("--fulltext", action="store_true", help="下载标题/摘要未命中论文的 PDF，在正文中匹配关键词（文本按内容哈希缓存）")
+	parser.add_argument("--deadline", type=float, metavar="SECONDS", help="抓取截止时间（秒）：到时取消未完成的任务并导出已有结果")
+	parser.add_argument("--max-requests", type=int, metavar="N", help="全局最大请求数")
+	parser.add_argument("--max-bytes", type=int, metavar="N", help="全局最大下载字节数")
+	parser.add_argument("--profile", action="store_true", help="剖析事件循环：延迟、慢回调（含阻塞的协程）与按任务的墙钟/CPU 时间")
+	parser.add_argument("--profile-samples", metavar="PATH", help="与 --profile 一起使用：采样 CPU 调用栈，写成火焰图可用的 collapsed 格式")
+	parser.add_argument("--export-snapshots", metavar="DIR", help="抓取完成后把每个完整的来源-年份写成压缩快照文件，供其他机器导入")
+	parser.add_argument("--import-snapshots", nargs="+", metavar="PATH", help="导入快照文件或目录：对应的来源-年份不再抓取，直接参与匹配与导出")
+	parser.add_argument("--events", metavar="PATH", help="把进度/命中/错误/统计事件以 NDJSON 追加写入文件")
+	parser.add_argument("--queue", metavar="PATH", help="分片抓取：使用共享 SQLite 任务队列，本进程作为协调者入队、参与抓取并合并导出")
+	parser.add_argument("--worker", action="store_true", help="与 --queue 一起使用：只消费队列中的任务，配置从队列读取")
+	parser.add_argument("--spawn", type=int, default=0, metavar="N", help="协调者额外启动 N 个本机 worker 进程")
+	capture = parser.add_mutually_exclusive_group()
+	capture.add_argument("--record", metavar="DIR", help="录制所有 HTTP 请求与响应到目录，例如: captures/run1")
+	capture.add_argument("--replay", metavar="DIR", help="从录制目录回放响应，不访问网络")
 	return parser.parse_args()
 
 
@@ -55,12 +70,54 @@ def build_output_filename(config):
 	return f"{conf_part}_{keyword_part}_{year_part}.md"
 
 
-async def main():
+def load_worker_config(args):
+	"""worker 使用协调者写入队列的配置，保证各分片的来源、年份与关键词一致"""
+	from src.core.workqueue import WorkQueue
+
+	queue = WorkQueue(args.queue)
+	print(f"Waiting for a coordinator to publish the crawl config in {args.queue}...")
+	config = queue.wait_for_config()
+	queue.close()
+	for key in ("record_dir", "replay_dir", "events_file", "jsonl_file", "profile"):
+		config.pop(key, None)
+	config["queue_path"] = args.queue
+	config["queue_role"] = "worker"
+	if args.concurrency is not None:
+		config["concurrency"] = args.concurrency
+	if args.events:
+		config["events_file"] = args.events
+	apply_profile_args(config, args)
+	return config
+
+
+def apply_profile_args(config, args):
+	if args.profile or args.profile_samples:
+		config["profile"] = {**(config.get("profile") or {}), "enabled": True}
+	if args.profile_samples:
+		config["profile"]["samples_file"] = args.profile_samples
+
+
+def spawn_workers(queue_path, count):
+	import subprocess
+
+	command = [sys.executable, str(PROJECT_ROOT / "main.py"), "--queue", queue_path, "--worker"]
+	return [subprocess.Popen(command, cwd=str(PROJECT_ROOT)) for _ in range(count)]
+
+
+async def main(args=None):
+	args = args or parse_args()
 	print("🚀 Starting Paper-Tunneling...")
-    
+
+	if args.worker:
+		if not args.queue:
+			raise ValueError("--worker requires --queue PATH")
+		config = load_worker_config(args)
+		await run_engine(config, config.get("conferences", []), config.get("journals", []))
+		print("\n✅ Worker finished: results were committed to the shared queue.")
+		return
+
 	# 1. 加载配置
 	config = load_config()
-	args = parse_args()
 
 	# 1.1 CLI 覆盖配置
 	cli_override = False
@@ -80,6 +137,35 @@ async def main():
 		config["concurrency"] = args.concurrency
 		cli_override = True
 
+	# 排序、预算、录制/回放与事件输出不影响输出文件名
+	if args.top_k is not None:
+		config["top_k"] = args.top_k
+	if args.jsonl:
+		config["jsonl_file"] = args.jsonl
+	if args.enrich:
+		config["enrichment"] = {**(config.get("enrichment") or {}), "enabled": True}
+	if args.download_pdfs:
+		config["downloads"] = {**(config.get("downloads") or {}), "enabled": True}
+	if args.fulltext:
+		config["fulltext"] = {**(config.get("fulltext") or {}), "enabled": True}
+	for name in ("deadline", "max_requests", "max_bytes"):
+		if getattr(args, name) is not None:
+			config["budget"] = {**(config.get("budget") or {}), name: getattr(args, name)}
+	if args.events:
+		config["events_file"] = args.events
+	apply_profile_args(config, args)
+	if args.export_snapshots:
+		config["snapshots"] = {**(config.get("snapshots") or {}), "export_dir": args.export_snapshots}
+	if args.import_snapshots:
+		config["snapshots"] = {**(config.get("snapshots") or {}), "import": args.import_snapshots}
+	if args.record:
+		config["record_dir"] = args.record
+	if args.replay:
+		config["replay_dir"] = args.replay
+	if args.queue:
+		config["queue_path"] = args.queue
+		config["queue_role"] = "coordinator"
+
 	if cli_override:
 		config["output_filename"] = build_output_filename(config)
 
@@ -91,78 +177,50 @@ async def main():
 		conferences = []
 	if conferences is None:
 		conferences = ["icml"]
-	def _slug_name(text: str) -> str:
-		return "-".join(text.lower().split())
-
-	journal_aliases = {
-		"nmi": "nature-machine-intelligence",
-		"ncs": "nature-computational-science",
-		"npjqi": "npj-quantum-information",
-		"prl": "physical-review-letters",
-		"quantum": "quantum",
-		"arxiv": "arxiv",
-	}
-
-	conferences = [c.lower() for c in conferences]
-	journals = [journal_aliases.get(j, j).lower() for j in journals]
-	config["conferences"] = conferences
-	config["journals"] = journals
-
-	targets = config.get("targets", [])
-	selected_targets = []
-	if journals:
-		journal_set = set(journals)
-		for target in targets:
-			name = target.get("name", "")
-			issn = (target.get("issn", "") or "").lower()
-			slug = _slug_name(name)
-			if issn in journal_set or slug in journal_set:
-				selected_targets.append(target)
-				continue
-			alias = journal_aliases.get(journals[0], "") if journals else ""
-			if alias and slug == alias:
-				selected_targets.append(target)
-
-	if selected_targets:
-		config["journals"] = [_slug_name(t.get("name", "")) for t in selected_targets]
-    
-	# 2. 初始化爬虫列表 (目前只有 ICML)
-	scrapers = []
+
+	workers = []
+	try:
+		await run_engine(config, conferences, journals, spawn=args.spawn if args.queue else 0, workers=workers)
+	finally:
+		for process in workers:
+			process.wait()
     
-	if "icml" in conferences:
-		icml_scraper = ICMLScraper(config)
-		scrapers.append(icml_scraper)
-	if "neurips" in conferences:
-		neurips_scraper = NeurIPSScraper(config)
-		scrapers.append(neurips_scraper)
-	if "iclr" in conferences:
-		iclr_scraper = ICLRScraper(config)
-		scrapers.append(iclr_scraper)
-	for target in selected_targets:
-		if target.get("name", "").lower() == "arxiv" or target.get("issn", "").lower() == "arxiv":
-			scrapers.append(ArxivScraper(config))
-		else:
-			scrapers.append(OpenAlexScraper(config, target))
-            
-	# Fallback for arxiv if specified directly in conferences or journals but not in targets
-	if "arxiv" in conferences or "arxiv" in journals:
-		# check if already added
-		if not any(isinstance(s, ArxivScraper) for s in scrapers):
-			scrapers.append(ArxivScraper(config))
+	print("\n✅ Job Done! Check the 'results' folder.")
 
+
+async def run_engine(config, conferences, journals, spawn=0, workers=None):
+	# 2. 按名称/别名/ISSN 解析来源，只导入被选中的爬虫模块
+	registry.register_targets(config.get("targets", []))
+	specs = []
+	for group, tokens in (("conferences", conferences), ("journals", journals)):
+		found, unknown = registry.resolve(tokens)
+		for token in unknown:
+			print(f"Unknown source '{token}', skipped.")
+		config[group] = [spec.name for spec in found]
+		specs.extend(spec for spec in found if spec not in specs)
+
+	scrapers = [spec.create(config) for spec in specs]
 	if not scrapers:
-		raise ValueError("No valid conferences selected. Currently supported: icml, neurips, iclr, arxiv, openalex targets")
+		names = ", ".join(spec.aliases[0] if spec.aliases else spec.name for spec in registry.available())
+		raise ValueError(f"No valid conferences selected. Currently supported: {names}, or any OpenAlex target in config.yaml")
     
 	# 3. 启动引擎
+	from src.core.engine import CrawlerEngine
+
 	engine = CrawlerEngine(scrapers, config)
+	# 协调者已把配置写入队列，此时启动的本机 worker 可以直接读取
+	if spawn:
+		workers.extend(spawn_workers(config["queue_path"], spawn))
 	await engine.run()
-    
-	print("\n✅ Job Done! Check the 'results' folder.")
 
 
 if __name__ == "__main__":
+	# 先解析参数：--help 与参数错误无需导入 asyncio 及网络栈
+	cli_args = parse_args()
+	import asyncio
+
 	# Windows 兼容性处理
 	if os.name == 'nt':
 		asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
     
-	asyncio.run(main())
+	asyncio.run(main(cli_args))
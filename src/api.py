@@ -0,0 +1,65 @@
+"""程序化接口：在其他 asyncio 服务中直接调用 Paper-Tunneling，而不是运行 main.py 再解析 Markdown。
+
+	import aiohttp
+	from src.api import search
+
+	async with aiohttp.ClientSession() as session:
+		async for paper in search(["quantum"], ["icml", "nmi"], [2024], session=session):
+			print(paper.source, paper.year, paper.title, paper.url)
+
+不读取 config.yaml，也不写任何文件；其余配置项（concurrency、retry、transport 等）
+通过 config 或关键字参数传入，含义与 config.yaml 相同。
+"""
+from .scrapers import registry
+
+
+def build_config(keywords, years=None, config=None, **options):
+	"""合并调用方配置与参数；默认关闭终端输出。年份必须通过 years 或 config["years"] 给出，否则抛出 ValueError"""
+	settings = dict(config or {})
+	settings.update(options)
+	settings["keywords"] = list(keywords)
+	if years is not None:
+		settings["years"] = list(years)
+	if not settings.get("years"):
+		raise ValueError("No years selected: pass years=[...] or set config['years']")
+	settings.setdefault("console", False)
+	# 分片队列由协调者/worker 进程使用，不适用于库调用
+	settings.pop("queue_path", None)
+	settings.pop("queue_role", None)
+	return settings
+
+
+def create_scrapers(settings, sources):
+	"""按名称/别名/ISSN 创建爬虫，无法识别的来源抛出 ValueError"""
+	registry.register_targets(settings.get("targets", []))
+	specs, unknown = registry.resolve(sources)
+	if unknown:
+		raise ValueError(f"Unknown sources: {', '.join(unknown)}")
+	if not specs:
+		raise ValueError("No sources selected")
+	settings["conferences"] = [spec.name for spec in specs if spec.kind != "journal"]
+	settings["journals"] = [spec.name for spec in specs if spec.kind == "journal"]
+	return [spec.create(settings) for spec in specs]
+
+
+async def search(keywords, sources=("icml",), years=None, *, session=None, config=None, buffer=100, **options):
+	"""抓取 sources 的 years 年论文，命中 keywords 的论文一经解析即产出 Paper。
+
+	years 为空且 config 中也没有 years 时抛出 ValueError。
+
+	session：调用方持有的 aiohttp.ClientSession，结束后不会被关闭；为 None 时自行创建。
+	buffer：最多缓冲多少篇未被取走的论文，消费较慢时抓取随之暂停。
+	停止迭代（break / aclose）或取消所在任务都会取消尚未完成的抓取。
+	"""
+	settings = build_config(keywords, years, config, **options)
+	scrapers = create_scrapers(settings, sources)
+
+	from .core.engine import CrawlerEngine
+
+	engine = CrawlerEngine(scrapers, settings)
+	stream = engine.stream(session=session, buffer=buffer)
+	try:
+		async for paper in stream:
+			yield paper
+	finally:
+		await stream.aclose()
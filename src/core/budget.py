@@ -0,0 +1,167 @@
+import contextvars
+import inspect
+import time
+
+import aiohttp
+
+
+# 当前任务所属的来源（爬虫的 conference_name）；Frontier 在执行任务前设置，请求与字节据此按来源记账
+current_source = contextvars.ContextVar("current_source", default=None)
+
+LIMITS = ("deadline", "max_requests", "max_bytes")
+
+
+def task_year(handler, args):
+	"""任务所属的年份：处理函数的 year 参数，没有该参数时为 None"""
+	try:
+		return inspect.signature(handler).bind_partial(*args).arguments.get("year")
+	except TypeError:
+		return None
+
+
+class BudgetExceeded(BaseException):
+	"""抓取预算耗尽。
+
+	与 asyncio.CancelledError 一样继承 BaseException：爬虫里大量 `except Exception`
+	兜底会把普通异常当作单个请求失败吞掉，而预算耗尽需要一直传到 Frontier，
+	由它把任务记为跳过、把对应的来源-年份标记为不完整。
+	"""
+
+	def __init__(self, reason, source=None):
+		super().__init__(f"{reason} budget exhausted" + (f" for {source}" if source else ""))
+		self.reason = reason
+		self.source = source
+
+
+class CrawlBudget:
+	"""全局与按来源的抓取预算：截止时间（秒）、最大请求数、最大下载字节数。
+
+	请求数在 RetryPolicy 每次发出请求前记账并检查；字节数通过 aiohttp TraceConfig
+	在 read()/text() 收到响应数据时累计，流式读取（详情页、PDF）由读取方自行记账。
+	字节只记账不打断，正在读取的响应照常完成。超出后该范围内
+	新的请求抛出 BudgetExceeded；全局截止时间另由引擎取消整个前沿队列。
+	"""
+
+	def __init__(self, config, sources=()):
+		settings = config.get("budget", {}) or {}
+		self.limits = {name: settings.get(name) for name in LIMITS}
+		self.source_limits = {}
+		for key, limits in (settings.get("sources") or {}).items():
+			name = self._match_source(key, sources)
+			if name is not None:
+				self.source_limits[name] = {limit: (limits or {}).get(limit) for limit in LIMITS}
+		self.used = {"requests": 0, "bytes": 0}
+		self.source_used = {}
+		# (来源, 年份) -> 原因；年份未知时为 None，表示该来源的所有年份
+		self.incomplete = {}
+		self.exhausted = {}
+		self._start = None
+
+	@staticmethod
+	def _match_source(key, sources):
+		"""配置中的来源可用名称、别名或 ISSN，按注册表解析后与爬虫名称对应"""
+		from ..scrapers import registry
+
+		spec = registry.lookup(key)
+		target = spec.name if spec is not None else registry.slug_name(key)
+		for name in sources:
+			if registry.slug_name(name) == target:
+				return name
+		return None
+
+	@property
+	def enabled(self):
+		return any(v is not None for v in self.limits.values()) or bool(self.source_limits)
+
+	def start(self):
+		self._start = time.monotonic()
+
+	def elapsed(self):
+		return time.monotonic() - self._start if self._start is not None else 0.0
+
+	def remaining_time(self):
+		"""距全局截止时间的秒数，未设置时为 None"""
+		if self.limits["deadline"] is None:
+			return None
+		return max(0.0, self.limits["deadline"] - self.elapsed())
+
+	def _over(self, limits, used):
+		if not limits:
+			return None
+		if limits.get("deadline") is not None and self.elapsed() >= limits["deadline"]:
+			return "deadline"
+		if limits.get("max_requests") is not None and used["requests"] >= limits["max_requests"]:
+			return "max_requests"
+		if limits.get("max_bytes") is not None and used["bytes"] >= limits["max_bytes"]:
+			return "max_bytes"
+		return None
+
+	def spent(self):
+		"""全局预算已耗尽时返回原因，否则为 None"""
+		return self._over(self.limits, self.used)
+
+	def check(self, source=None):
+		"""全局或 source 的预算已耗尽时抛出 BudgetExceeded"""
+		source = source if source is not None else current_source.get()
+		reason = self._over(self.limits, self.used)
+		if reason is not None:
+			self.exhausted.setdefault(None, reason)
+			raise BudgetExceeded(reason)
+		if source is not None:
+			used = self.source_used.get(source)
+			reason = self._over(self.source_limits.get(source), used or {"requests": 0, "bytes": 0})
+			if reason is not None:
+				self.exhausted.setdefault(source, reason)
+				raise BudgetExceeded(reason, source)
+
+	def charge_request(self):
+		"""发出请求前调用：检查预算并计数"""
+		source = current_source.get()
+		self.check(source)
+		self.used["requests"] += 1
+		if source is not None:
+			self.source_used.setdefault(source, {"requests": 0, "bytes": 0})["requests"] += 1
+
+	def charge_bytes(self, size):
+		self.used["bytes"] += size
+		source = current_source.get()
+		if source is not None:
+			self.source_used.setdefault(source, {"requests": 0, "bytes": 0})["bytes"] += size
+
+	def trace_config(self):
+		trace = aiohttp.TraceConfig()
+
+		async def _on_chunk(session, context, params):
+			self.charge_bytes(len(params.chunk))
+
+		trace.on_response_chunk_received.append(_on_chunk)
+		return trace
+
+	def mark_incomplete(self, handler, args, reason):
+		"""记录因预算未执行完的任务所属的来源-年份（年份取自处理函数的 year 参数）"""
+		owner = getattr(handler, "__self__", None)
+		source = getattr(owner, "conference_name", None)
+		if source is None:
+			return
+		self.incomplete.setdefault((source, task_year(handler, args)), reason)
+
+	def apply(self, scrapers):
+		"""把不完整标记写入各爬虫的按年统计"""
+		for scraper in scrapers:
+			for (source, year), reason in self.incomplete.items():
+				if source != scraper.conference_name:
+					continue
+				# 年份未知时标记该来源抓取的所有年份（从快照导入的年份不受影响）
+				years = [year] if year is not None else scraper.crawl_years()
+				for y in years:
+					if y in scraper.stats:
+						scraper.stats[y]["incomplete"] = reason
+
+	def summary(self):
+		parts = [f"{self.used['requests']} requests, {self.used['bytes'] / 2**20:.1f} MiB in {self.elapsed():.1f}s"]
+		for scope, reason in self.exhausted.items():
+			parts.append(f"{scope or 'global'} {reason} reached")
+		if self.incomplete:
+			labels = sorted(f"{source} {year if year is not None else 'all years'}" for source, year in self.incomplete)
+			parts.append("incomplete: " + ", ".join(labels))
+		return "; ".join(parts)
@@ -0,0 +1,242 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+from urllib.parse import urljoin
+
+import aiohttp
+
+from .events import LOG, STATS
+from .frontier import Frontier
+from .retry import RetryableError
+
+
+# Content-Range: bytes <start>-<end>/<total>  或  bytes */<total>
+_CONTENT_RANGE_RE = re.compile(r"bytes\s+(?:(\d+)-\d+|\*)/(\d+|\*)")
+
+
+def derive_pdf_url(url):
+	"""不访问网络即可推出的 PDF 链接：arXiv 摘要页与 OpenReview 论坛页"""
+	url = url or ""
+	if "arxiv.org/abs/" in url:
+		return url.replace("/abs/", "/pdf/", 1)
+	if "openreview.net/forum" in url:
+		return url.replace("/forum", "/pdf", 1)
+	return None
+
+
+def find_pdf_url(soup, page_url):
+	"""详情页/出版商页面中的 PDF 链接：citation_pdf_url 元数据，其次 OpenReview 或 .pdf 链接"""
+	meta = soup.find("meta", attrs={"name": "citation_pdf_url"})
+	if meta and meta.get("content"):
+		return urljoin(page_url, meta["content"].strip())
+	for link in soup.find_all("a", href=True):
+		href = link["href"].strip()
+		if "openreview.net/forum" in href:
+			return href.replace("/forum", "/pdf", 1)
+		if "openreview.net/pdf" in href or href.lower().split("?")[0].endswith(".pdf"):
+			return urljoin(page_url, href)
+	return None
+
+
+def _file_sha256(path, chunk_size):
+	digest = hashlib.sha256()
+	with open(path, "rb") as f:
+		for chunk in iter(lambda: f.read(chunk_size), b""):
+			digest.update(chunk)
+	return digest.hexdigest()
+
+
+class PDFDownloader:
+	"""并发、可续传的 PDF 下载。
+
+	复用抓取时的 ClientSession 与 RetryPolicy（同一连接池的每 host 并发上限与熔断），
+	任务经 Frontier 按 PDF 链接去重。响应按块写入 .partial/ 下的临时文件，内存占用与
+	文件大小无关；中断后再次运行时用 Range 从已有字节处续传。完成的文件按内容 SHA-256
+	命名，不同链接指向同一文件时只保留一份，index.jsonl 记录链接到内容哈希的映射，
+	已下载过的链接不再请求。
+	"""
+
+	def __init__(self, config, retry_policy, events):
+		settings = config.get("downloads", {}) or {}
+		self.directory = settings.get("dir") or os.path.join(config.get("output_dir", "results"), "pdfs")
+		self.chunk_size = settings.get("chunk_size", 65536)
+		self.concurrency = settings.get("concurrency") or config.get("concurrency", 20)
+		# 会话的总超时（timeout）针对 HTML 页面，大文件会被它打断并计入重试与熔断；
+		# 下载不限总时长，只限制连接与两次收到数据之间的间隔
+		transport = config.get("transport", {}) or {}
+		self.timeout = aiohttp.ClientTimeout(
+			total=None,
+			connect=transport.get("connect_timeout", 10),
+			sock_read=settings.get("read_timeout", 60),
+		)
+		self.retry_policy = retry_policy
+		self.events = events
+		self.partial_dir = os.path.join(self.directory, ".partial")
+		self.index_path = os.path.join(self.directory, "index.jsonl")
+		self.index = self._load_index()
+		self._waiting = {}
+		self.stats = {
+			"papers": 0, "downloaded": 0, "resumed": 0, "cached": 0,
+			"duplicates": 0, "no_pdf": 0, "failed": 0, "bytes": 0,
+		}
+
+	def _load_index(self):
+		index = {}
+		if not os.path.exists(self.index_path):
+			return index
+		with open(self.index_path, "r", encoding="utf-8") as f:
+			for line in f:
+				try:
+					entry = json.loads(line)
+				except json.JSONDecodeError:
+					continue
+				index[entry["url"]] = entry
+		return index
+
+	def path_for(self, digest):
+		return os.path.join(self.directory, f"{digest}.pdf")
+
+	@staticmethod
+	def digest_of(path):
+		"""下载得到的文件以内容哈希命名，文件名即哈希"""
+		return os.path.splitext(os.path.basename(path))[0]
+
+	def summary(self):
+		s = self.stats
+		return (
+			f"{s['downloaded']} downloaded ({s['resumed']} resumed, {s['bytes'] / 2**20:.1f} MiB), "
+			f"{s['cached']} cached, {s['duplicates']} duplicate files, "
+			f"{s['no_pdf']} without PDF link, {s['failed']} failed"
+		)
+
+	async def download(self, session, papers):
+		"""下载每篇论文的 PDF，并把本地路径写入 paper.pdf_path"""
+		self.events.emit(LOG, f"[Downloads] Fetching PDFs for {len(papers)} papers...")
+		frontier = Frontier(workers=self.concurrency, events=self.events)
+		for paper in papers:
+			await frontier.put(self.download_paper, session, paper, key=id(paper))
+		await frontier.run()
+		self.stats["failed"] += frontier.stats["failed"]
+		self.events.emit(STATS, f"[Downloads] {self.summary()}.", **self.stats)
+
+	async def download_paper(self, session, paper):
+		"""下载一篇论文的 PDF，返回本地路径（没有 PDF 链接时为 None）"""
+		os.makedirs(self.partial_dir, exist_ok=True)
+		self.stats["papers"] += 1
+		pdf_url = paper.pdf_url or derive_pdf_url(paper.url) or await self._resolve(session, paper.url)
+		if not pdf_url:
+			self.stats["no_pdf"] += 1
+			return None
+		paper.pdf_url = pdf_url
+
+		# 同一链接可能对应多篇论文（如同一 arXiv 预印本），只下载一次
+		if pdf_url in self._waiting:
+			paper.pdf_path = await self._waiting[pdf_url]
+			return paper.pdf_path
+		future = self._waiting[pdf_url] = asyncio.get_running_loop().create_future()
+		try:
+			path = await self._fetch(session, pdf_url)
+		except BaseException:
+			future.set_result(None)
+			raise
+		future.set_result(path)
+		paper.pdf_path = path
+		return path
+
+	async def _resolve(self, session, page_url):
+		"""详情页未给出 PDF 链接时，读取落地页的 citation_pdf_url"""
+		if not page_url:
+			return None
+		from bs4 import BeautifulSoup
+
+		async def _read(resp):
+			if resp.status != 200:
+				return None
+			return await resp.text()
+
+		try:
+			html = await self.retry_policy.request(session, page_url, _read)
+		except (aiohttp.ClientError, asyncio.TimeoutError, RetryableError):
+			return None
+		if not html:
+			return None
+		return find_pdf_url(BeautifulSoup(html, "html.parser"), page_url)
+
+	async def _fetch(self, session, url):
+		entry = self.index.get(url)
+		if entry and os.path.exists(self.path_for(entry["sha256"])):
+			self.stats["cached"] += 1
+			return self.path_for(entry["sha256"])
+
+		part = os.path.join(self.partial_dir, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".part")
+		offset = os.path.getsize(part) if os.path.exists(part) else 0
+		headers = {"Range": f"bytes={offset}-"} if offset else {}
+
+		async def _read(resp):
+			try:
+				return await self._write(resp, part)
+			finally:
+				# 连接中断后由重试策略重发时，从已写入的字节处续传
+				if os.path.exists(part) and os.path.getsize(part):
+					headers["Range"] = f"bytes={os.path.getsize(part)}-"
+
+		resumed = await self.retry_policy.request(session, url, _read, headers=headers, timeout=self.timeout)
+		if resumed is None:
+			# 临时文件与服务器上的内容对不上，已丢弃，从头下载
+			resumed = await self.retry_policy.request(session, url, _read, timeout=self.timeout)
+		# 整个文件写完后再计算哈希：续传与重试都可能改写已有字节
+		digest = await asyncio.to_thread(_file_sha256, part, self.chunk_size)
+		size = os.path.getsize(part)
+		path = self.path_for(digest)
+		if os.path.exists(path):
+			os.remove(part)
+			self.stats["duplicates"] += 1
+		else:
+			os.replace(part, path)
+		self.stats["downloaded"] += 1
+		self.stats["resumed"] += int(resumed)
+		self._remember({"url": url, "sha256": digest, "bytes": size})
+		return path
+
+	async def _write(self, resp, part):
+		"""把响应流写入临时文件，返回是否为续传。
+
+		206 按 Content-Range 的起点截断后追加（重试时起点可能早于文件末尾）；
+		200 表示服务器忽略了 Range，从头重写；416 时若已有文件大小等于总长度即为完整内容，
+		否则丢弃临时文件并返回 None。
+		"""
+		if resp.status == 416:
+			match = _CONTENT_RANGE_RE.match(resp.headers.get("Content-Range", ""))
+			if match and match.group(2) != "*" and os.path.exists(part) and os.path.getsize(part) == int(match.group(2)):
+				return True
+			if os.path.exists(part):
+				os.remove(part)
+			return None
+		resp.raise_for_status()
+
+		start = 0
+		if resp.status == 206:
+			match = _CONTENT_RANGE_RE.match(resp.headers.get("Content-Range", ""))
+			start = int(match.group(1)) if match and match.group(1) else 0
+		with open(part, "r+b" if start and os.path.exists(part) else "wb") as f:
+			f.truncate(start)
+			f.seek(start)
+			first = start == 0
+			async for chunk in resp.content.iter_chunked(self.chunk_size):
+				if first:
+					# 落地页、登录页等 HTML 响应不是 PDF
+					if not chunk.startswith(b"%PDF"):
+						raise ValueError(f"Not a PDF ({resp.headers.get('Content-Type', 'unknown type')}): {resp.url}")
+					first = False
+				f.write(chunk)
+				self.stats["bytes"] += len(chunk)
+				if self.retry_policy.budget is not None:
+					self.retry_policy.budget.charge_bytes(len(chunk))
+		return start > 0
+
+	def _remember(self, entry):
+		self.index[entry["url"]] = entry
+		with open(self.index_path, "a", encoding="utf-8") as f:
+			f.write(json.dumps(entry) + "\n")
@@ -1,6 +1,18 @@
-import aiohttp
+import asyncio
+import contextlib
+import json
 import os
+from .budget import BudgetExceeded, CrawlBudget, task_year
+from .downloads import PDFDownloader
+from .events import FOUND, LOG, STATS, build_event_bus
 from .exporter import MarkdownExporter
+from .frontier import Frontier
+from .ranking import BM25Ranker
+from .records import PaperStore
+from .recorder import CaptureStore, RecordingSession, ReplaySession
+from .retry import RetryPolicy
+from .streaming import PartialFetcher
+from .transport import ConnectionStats, build_session
 
 
 class CrawlerEngine:
@@ -8,18 +20,423 @@ class CrawlerEngine:
 		self.scrapers = scrapers
 		self.config = config
 		self.exporter = MarkdownExporter(config)
+		# 所有爬虫共享同一重试策略：按 host 熔断与重试统计跨来源汇总
+		self.retry_policy = RetryPolicy(config)
+		self.connection_stats = ConnectionStats()
+		self.partial_fetcher = PartialFetcher(config)
+		self.store = PaperStore()
+		self.ranker = BM25Ranker(config)
+		self.events = build_event_bus(config)
+		self.retry_policy.breaker.events = self.events
+		# 截止时间、请求数与字节数预算（全局与按来源），未配置时不做任何检查
+		budget = CrawlBudget(config, [scraper.conference_name for scraper in scrapers])
+		self.budget = budget if budget.enabled else None
+		self.retry_policy.budget = self.budget
+		if config.get("record_dir") or config.get("replay_dir"):
+			# 是否发 Range 取决于并发时序，录制/回放时关闭以保证请求序列可复现
+			self.partial_fetcher.use_range = False
+		# 分片模式：任务放在共享队列中，由协调者与多个 worker 进程共同消费
+		self.queue = None
+		if config.get("queue_path"):
+			# 只在分片模式下导入（sqlite3 与队列实现）
+			from .workqueue import WorkQueue
+
+			self.queue = WorkQueue.from_config(config)
+		self.is_worker = self.queue is not None and config.get("queue_role") == "worker"
+		if self.queue is not None and not self.is_worker:
+			self.queue.publish_config(config)
+		# --profile：事件循环延迟、慢回调与按任务的 CPU 时间，结束时作为统计事件输出
+		self.profiler = None
+		if (config.get("profile") or {}).get("enabled"):
+			from .profiling import LoopProfiler
+
+			self.profiler = LoopProfiler(config, self.events)
+		for scraper in self.scrapers:
+			scraper.retry_policy = self.retry_policy
+			scraper.partial_fetcher = self.partial_fetcher
+			scraper.store = self.store
+			scraper.events = self.events
+		# 导入的快照：对应的来源-年份不再抓取（worker 只消费协调者入队的任务）
+		self.snapshots = [] if self.is_worker else self._open_snapshots()
+
+	def _open_session(self):
+		# 回放模式：完全不建立网络连接
+		replay_dir = self.config.get("replay_dir")
+		if replay_dir:
+			return ReplaySession(CaptureStore(replay_dir).open_for_replay())
+
+		session = build_session(self.config, self.connection_stats, self.budget)
+		record_dir = self.config.get("record_dir")
+		if record_dir:
+			return RecordingSession(session, CaptureStore(record_dir).open_for_record())
+		return session
 
 	async def run(self):
-		# 创建统一的 Session，复用 TCP 连接
-		async with aiohttp.ClientSession() as session:
-			all_papers = []
-			global_stats = {}
+		self.events.start()
+		if self.profiler is not None:
+			self.profiler.start()
+		try:
+			# 创建统一的 Session，复用 TCP 连接 (连接池与超时见 transport.py)
+			async with self._open_session() as session:
+				global_stats = await self._crawl(session)
+				# worker 的论文与统计已写入共享队列，由协调者统一导出
+				if self.is_worker:
+					return
+				if self.queue is not None:
+					global_stats = self._merge_shards()
+					self._load_snapshots(global_stats)
+				self._export_snapshots(global_stats)
+				await self._within_budget(self._match_fulltext(session))
+
+				# 以全部扫描到的论文为语料做 BM25 排序，只导出命中的论文（可选 top-k）
+				papers = self.ranker.rank(self.store, top_k=self.config.get("top_k"))
+				await self._within_budget(self._enrich(session, papers))
+				download_stats = await self._within_budget(self._download(session, papers))
+		finally:
+			if self.profiler is not None:
+				await self.profiler.stop()
+			# 导出前先刷新并停止事件线程，避免与报告输出交错
+			self.events.close()
+			if self.queue is not None:
+				self.queue.close()
+
+		# 导出结果
+		self.exporter.save(
+			papers, global_stats, network_stats=self.retry_policy.stats,
+			transport_stats=self.connection_stats, stream_stats=self.partial_fetcher.stream_stats,
+			download_stats=download_stats, budget_stats=self.budget,
+		)
+		if self.config.get("jsonl_file"):
+			self.exporter.save_jsonl(papers, self.config["jsonl_file"])
+
+	async def stream(self, session=None, buffer=100):
+		"""边抓取边产出命中的论文（异步生成器），不排序也不导出。
+
+		session 由调用方传入时沿用且不关闭；最多缓冲 buffer 篇未被取走的论文，
+		缓冲区满时抓取 worker 暂停取新任务（背压）。调用方停止迭代或所在任务被取消时，
+		未完成的抓取任务一并取消。
+		"""
+		matches = asyncio.Queue(maxsize=max(1, buffer))
+		done = object()
+		published = 0
+		failure = None
 
+		async def publish():
+			nonlocal published
+			start, published = published, len(self.store)
+			for row in range(start, published):
+				if self.store.matched[row]:
+					await matches.put(self.store[row])
+
+		async def crawl(session):
+			nonlocal failure
+			try:
+				await self._crawl(session, after_task=publish)
+				await publish()
+			except Exception as e:
+				failure = e
+			await matches.put(done)
+
+		self.events.start()
+		try:
+			async with (contextlib.nullcontext(session) if session is not None else self._open_session()) as session:
+				task = asyncio.create_task(crawl(session))
+				try:
+					while True:
+						paper = await matches.get()
+						if paper is done:
+							break
+						yield paper
+				finally:
+					task.cancel()
+					await asyncio.gather(task, return_exceptions=True)
+			if failure is not None:
+				raise failure
+		finally:
+			self.events.close()
+			if self.queue is not None:
+				self.queue.close()
+
+	async def _crawl(self, session, after_task=None):
+		global_stats = {}
+
+		# 所有来源与年份共用一个前沿队列，列表页优先、详情页随发现随入队
+		if self.queue is not None:
+			from .workqueue import ShardedFrontier
+
+			settings = self.config.get("queue", {}) or {}
+			frontier = ShardedFrontier(
+				self.queue, self.scrapers, session, self.store,
+				workers=self.config.get("concurrency", 20),
+				events=self.events,
+				flush_interval=settings.get("flush_interval", 5.0),
+				poll_interval=settings.get("poll_interval", 1.0),
+				shard_stats=self._shard_stats,
+				budget=self.budget,
+			)
+		else:
+			frontier = Frontier(
+				workers=self.config.get("concurrency", 20),
+				max_pending=self.config.get("max_pending", 1000),
+				events=self.events,
+				after_task=after_task,
+				budget=self.budget,
+			)
+		if self.budget is not None:
+			self.budget.start()
+		# 分片模式下存储在合并时重建，快照在合并之后再导入
+		if self.queue is None:
+			self._load_snapshots()
+		if not self.is_worker:
 			for scraper in self.scrapers:
-				print(f"--- Launching {scraper.conference_name} Scraper ---")
-				papers, stats = await scraper.run(session)
-				all_papers.extend(papers)
-				global_stats[scraper.conference_name] = stats
-            
-			# 导出结果
-			self.exporter.save(all_papers, global_stats)
+				self.events.emit(LOG, f"--- Launching {scraper.conference_name} Scraper ---")
+				await scraper.seed(frontier, session)
+			if self.queue is not None:
+				await frontier.mark_seeded()
+		await self._run_frontier(frontier)
+
+		if self.budget is not None:
+			self.budget.apply(self.scrapers)
+		for scraper in self.scrapers:
+			scraper.finish()
+			global_stats[scraper.conference_name] = scraper.stats
+
+		net = self.retry_policy.stats
+		self.events.emit(
+			STATS,
+			f"[Network] {net['requests']} requests, {net['retries']} retries, "
+			f"{net['gave_up']} gave up, {net['circuit_opens']} circuit opens.",
+			scope="network", **net,
+		)
+		if not self.config.get("replay_dir"):
+			self.events.emit(
+				STATS, f"[Transport] {self.connection_stats.summary()}",
+				scope="transport", **self.connection_stats.stats,
+			)
+		if self.partial_fetcher.stream_stats.stats["pages"]:
+			self.events.emit(
+				STATS, f"[Streaming] {self.partial_fetcher.stream_stats.summary()}",
+				scope="streaming", **self.partial_fetcher.stream_stats.stats,
+			)
+		if self.budget is not None:
+			self.events.emit(STATS, f"[Budget] {self.budget.summary()}", scope="budget", **self.budget.used)
+		return global_stats
+
+	async def _run_frontier(self, frontier):
+		"""执行前沿队列；到达全局截止时间时取消所有未完成的任务，已抓取的结果照常保留"""
+		remaining = self.budget.remaining_time() if self.budget is not None else None
+		if remaining is None:
+			await frontier.run()
+			return
+		try:
+			await asyncio.wait_for(frontier.run(), remaining)
+		except asyncio.TimeoutError:
+			self.budget.exhausted.setdefault(None, "deadline")
+			pending = frontier.pending()
+			for handler, args in pending:
+				self.budget.mark_incomplete(handler, args, "deadline")
+			if self.queue is not None:
+				# 取消时已提交过一次；再提交一次，使不完整标记随分片统计写入队列
+				await frontier.flush()
+			self.events.emit(LOG, f"[Budget] Deadline reached: cancelled {len(pending)} outstanding tasks.")
+
+	async def _within_budget(self, stage):
+		"""抓取之后的可选阶段：全局预算已耗尽时跳过，执行中耗尽时保留已完成的部分"""
+		if self.budget is not None and self.budget.spent():
+			stage.close()
+			return None
+		try:
+			return await stage
+		except BudgetExceeded as e:
+			self.events.emit(LOG, f"[Budget] {e}: skipping the rest of this stage.")
+			return None
+
+	async def _enrich(self, session, papers):
+		"""可选：批量查询 OpenAlex，为会议与 arXiv 论文补全引用数、DOI 与 OpenAlex ID"""
+		if not (self.config.get("enrichment", {}) or {}).get("enabled"):
+			return
+		# 只在启用时导入 OpenAlex 模块
+		from ..scrapers.openalex import OpenAlexEnricher
+
+		sources = {scraper.conference_name for scraper in self.scrapers if scraper.enrichable}
+		targets = [paper for paper in papers if paper.source in sources]
+		if targets:
+			await OpenAlexEnricher(self.config, self.retry_policy, self.events).enrich(session, targets)
+
+	async def _match_fulltext(self, session):
+		"""可选：下载标题/摘要未命中论文的 PDF，在正文中匹配关键词"""
+		if not (self.config.get("fulltext", {}) or {}).get("enabled"):
+			return
+		# 只在启用时导入（进程池与 PDF 解析）
+		from .fulltext import FullTextMatcher
+
+		await FullTextMatcher(self.config, self.retry_policy, self.events).match(session, self.store, self.scrapers)
+
+	async def _download(self, session, papers):
+		"""可选：下载导出论文的 PDF（与抓取共用 session 与重试策略），返回下载器以便报告统计"""
+		if not (self.config.get("downloads", {}) or {}).get("enabled") or not papers:
+			return None
+		downloader = PDFDownloader(self.config, self.retry_policy, self.events)
+		await downloader.download(session, papers)
+		return downloader
+
+	def _open_snapshots(self):
+		"""打开配置中要导入的快照（只读取元数据），按来源名称与年份对应到爬虫"""
+		paths = (self.config.get("snapshots", {}) or {}).get("import") or []
+		if not paths:
+			return []
+		from ..scrapers.registry import slug_name
+		from .snapshot import Snapshot, find_snapshots
+
+		owners = {slug_name(scraper.conference_name): scraper for scraper in self.scrapers}
+		years = set(self.config.get("years") or [])
+		opened = []
+		for path in find_snapshots(paths):
+			snapshot = Snapshot(path)
+			scraper = owners.get(slug_name(snapshot.source))
+			if scraper is None or snapshot.year not in years or snapshot.year in scraper.loaded_years:
+				snapshot.close()
+				continue
+			if scraper.keyword_query and sorted(snapshot.keywords or []) != sorted(scraper.keywords):
+				self.events.emit(
+					LOG, f"[Snapshots] Skipping {path}: {snapshot.source} results depend on the keywords "
+					f"and it was crawled for {', '.join(snapshot.keywords or []) or 'no keywords'}.",
+				)
+				snapshot.close()
+				continue
+			scraper.loaded_years.add(snapshot.year)
+			opened.append((scraper, snapshot))
+		return opened
+
+	def _load_snapshots(self, global_stats=None):
+		"""把快照中的论文作为已扫描的行写入存储，按当前关键词重新匹配并更新统计"""
+		for scraper, snapshot in self.snapshots:
+			year = snapshot.year
+			found = 0
+			for title, authors, abstract, url, pdf_url in snapshot.rows():
+				matched = scraper.is_match(title, abstract)
+				self.store.append(scraper.conference_name, year, title, authors, abstract, url, matched, pdf_url)
+				if matched:
+					found += 1
+					scraper.emit(FOUND, year=year, title=title, url=url)
+			data = {"scanned": len(snapshot), "found": found, "snapshot": snapshot.created}
+			scraper.stats[year] = data
+			if global_stats is not None:
+				global_stats.setdefault(scraper.conference_name, {})[year] = data
+			self.events.emit(
+				STATS,
+				f"[Snapshots] {scraper.conference_name} {year}: {len(snapshot)} papers from {snapshot.path} "
+				f"(crawled {snapshot.created}), {found} found matching keywords.",
+				scope="snapshot", source=scraper.conference_name, year=year, scanned=len(snapshot), found=found,
+			)
+			snapshot.close()
+		self.snapshots = []
+
+	def _export_snapshots(self, global_stats):
+		"""可选：把本次完整抓取的每个来源-年份（全部扫描到的论文）写成一个快照文件。
+
+		是否完整看 global_stats：分片模式下是合并所有分片后的统计，而不是本进程爬虫的统计。
+		"""
+		directory = (self.config.get("snapshots", {}) or {}).get("export_dir")
+		if not directory:
+			return
+		from .snapshot import snapshot_name, write_snapshot
+
+		rows = {}
+		for row, (source_id, year) in enumerate(zip(self.store.source_ids, self.store.years)):
+			rows.setdefault((self.store.sources[source_id], year), []).append(row)
+		for scraper in self.scrapers:
+			for year, data in global_stats.get(scraper.conference_name, {}).items():
+				selected = rows.get((scraper.conference_name, year))
+				# 导入的、未抓完（预算耗尽或任务失败）的来源-年份不导出，避免把不完整的数据当作完整快照分享
+				if not selected or year in scraper.loaded_years or data.get("incomplete"):
+					continue
+				if data.get("failed"):
+					self.events.emit(
+						LOG, f"[Snapshots] Not exporting {scraper.conference_name} {year}: "
+						f"{data['failed']} pages failed, the crawl is partial.",
+					)
+					continue
+				path = os.path.join(directory, snapshot_name(scraper.conference_name, year))
+				keywords = scraper.keywords if scraper.keyword_query else None
+				size = write_snapshot(path, self.store, selected, scraper.conference_name, year, keywords)
+				self.events.emit(
+					LOG, f"[Snapshots] Wrote {len(selected)} {scraper.conference_name} {year} papers to {path} "
+					f"({size / 1024:.0f} KiB).",
+				)
+
+	def _shard_stats(self):
+		return {
+			"network": self.retry_policy.stats,
+			"transport": self.connection_stats.stats,
+			"streaming": self.partial_fetcher.stream_stats.stats,
+			# 因预算未抓完的来源-年份：[来源, 年份或 null, 原因]
+			"incomplete": [
+				[source, year, reason] for (source, year), reason in self.budget.incomplete.items()
+			] if self.budget is not None else [],
+			# 请求失败的页面数：[来源, 年份, 数量]
+			"failed": [
+				[scraper.conference_name, year, data["failed"]]
+				for scraper in self.scrapers for year, data in scraper.stats.items() if data.get("failed")
+			],
+		}
+
+	def _merge_shards(self):
+		"""协调者在队列清空后合并所有分片：论文去重后重新统计，网络统计按分片求和"""
+		self.store = self.queue.load_store()
+		global_stats = {
+			scraper.conference_name: {year: {"scanned": 0, "found": 0} for year in scraper.stats}
+			for scraper in self.scrapers
+		}
+		for source_id, year, matched in zip(self.store.source_ids, self.store.years, self.store.matched):
+			per_year = global_stats.setdefault(self.store.sources[source_id], {})
+			data = per_year.setdefault(year or None, {"scanned": 0, "found": 0})
+			data["scanned"] += 1
+			data["found"] += matched
+
+		shards = self.queue.shard_stats()
+		# 分片的不完整标记只说明原因：其他进程可能已经做完了这些任务。只有共享队列中仍有未完成
+		# （待领取、租约中或多次失败后放弃）任务的来源-年份才在合并后的统计中标记为不完整
+		reasons = {
+			(source, year): reason
+			for shard in shards.values()
+			for source, year, reason in shard.get("incomplete", [])
+		}
+		if self.budget is not None:
+			reasons.update(self.budget.incomplete)
+		owners = {scraper.conference_name: scraper for scraper in self.scrapers}
+		for source, method, payload, state in self.queue.outstanding():
+			owner = owners.get(source)
+			handler = getattr(owner, method, None)
+			if handler is None:
+				continue
+			year = task_year(handler, json.loads(payload))
+			if state == "failed":
+				reason = "failed"
+			else:
+				reason = reasons.get((source, year)) or reasons.get((source, None)) or "unfinished"
+			years = [year] if year is not None else owner.crawl_years()
+			for y in years:
+				if y in global_stats.get(source, {}):
+					global_stats[source][y].setdefault("incomplete", reason)
+		for shard in shards.values():
+			for source, year, count in shard.get("failed", []):
+				if year in global_stats.get(source, {}):
+					data = global_stats[source][year]
+					data["failed"] = data.get("failed", 0) + count
+		for scope, totals in (
+			("network", self.retry_policy.stats),
+			("transport", self.connection_stats.stats),
+			("streaming", self.partial_fetcher.stream_stats.stats),
+		):
+			for key in totals:
+				totals[key] = sum(shard.get(scope, {}).get(key, 0) for shard in shards.values())
+
+		counts = self.queue.counts()
+		self.events.emit(
+			STATS,
+			f"[Queue] Merged {len(self.store)} papers from {len(shards)} shards "
+			f"({counts['done']} tasks done, {counts['failed']} failed).",
+			scope="queue", shards=len(shards), papers=len(self.store), **counts,
+		)
+		return global_stats
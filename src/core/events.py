@@ -0,0 +1,159 @@
+import json
+import queue
+import sys
+import threading
+import time
+
+
+# 事件类型
+LOG = "log"
+PROGRESS = "progress"
+FOUND = "found"
+ERROR = "error"
+STATS = "stats"
+
+_STOP = object()
+
+
+class EventBus:
+	"""进程内事件总线。
+
+	emit 只把事件放进线程安全队列，不做任何 I/O；后台线程批量取出事件交给
+	各个 sink（终端渲染、NDJSON 文件），因此事件循环上不会出现阻塞写。
+	"""
+
+	def __init__(self, sinks=(), tick=0.1):
+		self.sinks = list(sinks)
+		self.tick = tick
+		self._queue = queue.SimpleQueue()
+		self._thread = None
+
+	def emit(self, kind, message=None, **fields):
+		event = {"ts": round(time.time(), 3), "type": kind}
+		if message is not None:
+			event["message"] = message
+		event.update(fields)
+		self._queue.put(event)
+
+	def start(self):
+		if self._thread is None:
+			self._thread = threading.Thread(target=self._run, name="event-bus", daemon=True)
+			self._thread.start()
+		return self
+
+	def close(self):
+		"""刷新所有尚未输出的事件并停止后台线程"""
+		if self._thread is None:
+			self.start()
+		self._queue.put(_STOP)
+		self._thread.join()
+		self._thread = None
+		for sink in self.sinks:
+			sink.close()
+
+	def _run(self):
+		while True:
+			batch = []
+			try:
+				batch.append(self._queue.get(timeout=self.tick))
+				while True:
+					batch.append(self._queue.get_nowait())
+			except queue.Empty:
+				pass
+			stopping = _STOP in batch
+			if stopping:
+				batch = [e for e in batch if e is not _STOP]
+			for sink in self.sinks:
+				try:
+					if batch:
+						sink.handle(batch)
+					sink.flush(force=stopping)
+				except Exception as e:
+					sys.stderr.write(f"Event sink {type(sink).__name__} failed: {e!r}\n")
+			if stopping:
+				return
+
+
+class ConsoleRenderer:
+	"""批量、限速的终端输出：一个刷新周期内的事件合并为一次写入。
+
+	命中论文过多时只显示前 max_found 条并汇总剩余数量；进度只保留每个
+	来源-年份的最新值，合并为一行。
+	"""
+
+	def __init__(self, stream=None, interval=0.5, max_found=10):
+		self.stream = stream or sys.stdout
+		self.interval = interval
+		self.max_found = max_found
+		self._lines = []
+		self._found = []
+		self._progress = {}
+		self._progress_dirty = False
+		self._last_flush = 0.0
+
+	def handle(self, events):
+		for event in events:
+			kind = event["type"]
+			if kind == PROGRESS:
+				self._progress[(event["source"], event["year"])] = (event["done"], event["total"])
+				self._progress_dirty = True
+			elif kind == FOUND:
+				self._found.append(event)
+			elif kind == ERROR:
+				self._lines.append(f"⚠️  {event.get('message', '')}")
+			elif "message" in event:
+				self._lines.append(event["message"])
+
+	def flush(self, force=False):
+		now = time.monotonic()
+		if not force and now - self._last_flush < self.interval:
+			return
+		self._last_flush = now
+
+		out = list(self._lines)
+		self._lines.clear()
+		for event in self._found[:self.max_found]:
+			out.append(f"[{event['source']} {event['year']}] Found: {event['title'][:50]}...")
+		if len(self._found) > self.max_found:
+			out.append(f"... and {len(self._found) - self.max_found} more papers found")
+		self._found.clear()
+		if self._progress_dirty:
+			parts = [f"{source} {year} {done}/{total}" for (source, year), (done, total) in self._progress.items()]
+			if parts:
+				out.append("Progress: " + " | ".join(parts))
+			# 已完成的来源-年份只显示最后一次
+			self._progress = {k: v for k, v in self._progress.items() if v[0] < v[1]}
+			self._progress_dirty = False
+		if out:
+			self.stream.write("\n".join(out) + "\n")
+			self.stream.flush()
+
+	def close(self):
+		pass
+
+
+class NDJSONSink:
+	"""把每个事件写成一行 JSON，供其他程序消费"""
+
+	def __init__(self, path):
+		self.path = path
+		self._file = open(path, "a", encoding="utf-8")
+
+	def handle(self, events):
+		self._file.write("".join(json.dumps(e, ensure_ascii=False, default=str) + "\n" for e in events))
+
+	def flush(self, force=False):
+		self._file.flush()
+
+	def close(self):
+		self._file.close()
+
+
+def build_event_bus(config):
+	"""按配置创建事件总线：默认输出到终端（console: false 时关闭），可选追加 NDJSON 文件"""
+	sinks = []
+	if config.get("console", True):
+		sinks.append(ConsoleRenderer(interval=config.get("console_interval", 0.5)))
+	if config.get("events_file"):
+		sinks.append(NDJSONSink(config["events_file"]))
+	return EventBus(sinks)
@@ -1,6 +1,9 @@
+import json
 import os
 import time
 
+from .budget import LIMITS
+
 
 class MarkdownExporter:
 	def __init__(self, config):
@@ -11,11 +14,9 @@ class MarkdownExporter:
 		self.conferences = config.get('conferences', [])
 		self.journals = config.get('journals', [])
 		self.journals_only = bool(self.journals) and not self.conferences
-        
-		if not os.path.exists(self.output_dir):
-			os.makedirs(self.output_dir)
 
-	def save(self, papers, stats):
+	def save(self, papers, stats, network_stats=None, transport_stats=None, stream_stats=None, download_stats=None,
+			budget_stats=None):
 		def _slug(text: str) -> str:
 			return "-".join(text.lower().split()) if text else "all"
 
@@ -24,11 +25,15 @@ class MarkdownExporter:
 		# 按会议与年份分组输出
 		grouped = {}
 		for paper in papers:
-			key = (paper['source'], paper['year'])
+			key = (paper.source, paper.year)
 			grouped.setdefault(key, []).append(paper)
 
 		for (conf, year), items in grouped.items():
-			items.sort(key=lambda x: x['title'])
+			# 有相关度得分时按得分降序，否则按标题排序
+			if any(p.score is not None for p in items):
+				items.sort(key=lambda x: (-(x.score or 0.0), x.title))
+			else:
+				items.sort(key=lambda x: x.title)
 			folder = os.path.join(self.output_dir, keywords_folder, _slug(conf), str(year))
 			os.makedirs(folder, exist_ok=True)
 			filename = self.filename
@@ -47,15 +52,63 @@ class MarkdownExporter:
 
 				f.write(f"## {conf} {year}\n\n")
 				for paper in items:
-					f.write(f"### [{paper['title']}]({paper['url']})\n")
-					f.write(f"**Authors:** {paper['authors']}\n\n")
-					f.write(f"**Abstract:**\n{paper['abstract']}\n\n")
+					f.write(f"### [{paper.title}]({paper.url})\n")
+					f.write(f"**Authors:** {paper.authors_text}\n\n")
+					if paper.score is not None:
+						f.write(f"**Score:** {paper.score:.2f}\n\n")
+					if paper.openalex_id:
+						doi = f"[{paper.doi}](https://doi.org/{paper.doi})" if paper.doi else "-"
+						f.write(
+							f"**Cited by:** {paper.cited_by if paper.cited_by is not None else '-'} | "
+							f"**DOI:** {doi} | **OpenAlex:** {paper.openalex_id}\n\n"
+						)
+					if paper.matched_in:
+						f.write(f"**Matched in:** {paper.matched_in}\n\n")
+						if paper.snippet:
+							f.write(f"> {paper.snippet}\n\n")
+					if paper.pdf_path:
+						f.write(f"**PDF:** [{os.path.basename(paper.pdf_path)}]({os.path.relpath(paper.pdf_path, folder)})\n\n")
+					elif paper.pdf_url:
+						f.write(f"**PDF:** {paper.pdf_url}\n\n")
+					f.write(f"**Abstract:**\n{paper.abstract}\n\n")
 					f.write("---\n\n")
 
 				f.write("\n### Statistics\n")
 				conf_stats = stats.get(conf, {})
 				data = conf_stats.get(year)
 				if data:
-					f.write(f"[{conf} {year}]: Scanned {data['scanned']} papers, {data['found']} found matching keywords.\n")
+					note = ""
+					if data.get("incomplete") in LIMITS:
+						note = f" (incomplete: {data['incomplete']} budget reached)"
+					elif data.get("incomplete"):
+						note = f" (incomplete: {data['incomplete']} tasks)"
+					if data.get("failed"):
+						note += f" ({data['failed']} pages failed)"
+					if data.get("snapshot"):
+						note = f" (from snapshot crawled {data['snapshot']})"
+					f.write(f"[{conf} {year}]: Scanned {data['scanned']} papers, {data['found']} found matching keywords{note}.\n")
+				if network_stats:
+					f.write(
+						f"[Network]: {network_stats['requests']} requests, {network_stats['retries']} retries, "
+						f"{network_stats['gave_up']} gave up, {network_stats['circuit_opens']} circuit opens.\n"
+					)
+				if transport_stats and transport_stats.stats["requests"]:
+					f.write(f"[Transport]: {transport_stats.summary()}.\n")
+				if stream_stats and stream_stats.stats["pages"]:
+					f.write(f"[Streaming]: {stream_stats.summary()}.\n")
+				if budget_stats is not None:
+					f.write(f"[Budget]: {budget_stats.summary()}.\n")
+				if download_stats and download_stats.stats["papers"]:
+					f.write(f"[Downloads]: {download_stats.summary()}.\n")
 
 			print(f"📄 Report saved to: {filepath}")
+
+	def save_jsonl(self, papers, path):
+		"""按给定顺序把论文写成 JSON Lines（含 rank 与 score），供其他程序消费"""
+		folder = os.path.dirname(path)
+		if folder:
+			os.makedirs(folder, exist_ok=True)
+		with open(path, "w", encoding="utf-8") as f:
+			for rank, paper in enumerate(papers, 1):
+				f.write(json.dumps({"rank": rank, **paper.to_dict()}, ensure_ascii=False) + "\n")
+		print(f"📄 Results saved to: {path}")
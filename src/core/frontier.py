@@ -0,0 +1,140 @@
+import asyncio
+import heapq
+import itertools
+
+from .budget import BudgetExceeded, current_source, task_year
+from .events import ERROR
+from .profiling import label_task, task_label
+
+
+# 任务类别：列表/索引页总是先于详情页出队
+LIST = 0
+DETAIL = 1
+
+
+class Frontier:
+	"""全局优先级 URL 前沿队列。
+
+	各爬虫把列表页作为种子放入队列，解析列表页时再把发现的详情页入队；
+	固定数量的 worker 从队列中取任务执行，协程只在真正执行时才创建。
+	去重按 key（通常是 URL）在所有年份与来源间全局生效。
+	"""
+
+	def __init__(self, workers=20, max_pending=1000, events=None, after_task=None, budget=None):
+		self.workers = max(1, workers)
+		self.events = events
+		# 预算耗尽时任务被跳过，其来源-年份记为不完整
+		self.budget = budget
+		# 每个任务结束后在同一 worker 中等待的回调；回调阻塞时该 worker 不再取新任务
+		self.after_task = after_task
+		self.max_pending = max_pending
+		self._queues = {LIST: [], DETAIL: []}
+		self._seen = set()
+		self._seq = itertools.count()
+		self._cond = asyncio.Condition()
+		self._unfinished = 0
+		self._blocked = 0
+		# run() 启动 worker 之前没有人取任务，入队不能等待
+		self._started = False
+		self._running = {}
+		self.stats = {"enqueued": 0, "duplicates": 0, "failed": 0, "skipped": 0}
+
+	def seen(self, key):
+		return key in self._seen
+
+	async def put(self, handler, *args, key=None, kind=DETAIL, priority=0):
+		"""入队 handler(*args)；key 已出现过时忽略并返回 False。
+
+		详情队列满时等待（背压）；worker 尚未启动（如 run 之前批量入队），或所有 worker
+		都会因此阻塞时直接放行，避免死锁。
+		"""
+		if key is not None:
+			if key in self._seen:
+				self.stats["duplicates"] += 1
+				return False
+			self._seen.add(key)
+		async with self._cond:
+			if self._started and kind == DETAIL and len(self._queues[DETAIL]) >= self.max_pending:
+				self._blocked += 1
+				try:
+					await self._cond.wait_for(
+						lambda: len(self._queues[DETAIL]) < self.max_pending or self._blocked >= self.workers
+					)
+				finally:
+					self._blocked -= 1
+			heapq.heappush(self._queues[kind], (priority, next(self._seq), handler, args))
+			self._unfinished += 1
+			self.stats["enqueued"] += 1
+			self._cond.notify_all()
+		return True
+
+	async def _get(self):
+		async with self._cond:
+			while True:
+				for kind in (LIST, DETAIL):
+					if self._queues[kind]:
+						item = heapq.heappop(self._queues[kind])
+						self._cond.notify_all()
+						return item
+				if self._unfinished == 0:
+					return None
+				await self._cond.wait()
+
+	async def _worker(self):
+		while True:
+			item = await self._get()
+			if item is None:
+				return
+			_, _, handler, args = item
+			worker = asyncio.current_task()
+			self._running[worker] = (handler, args)
+			# 任务中的请求按所属爬虫记账；--profile 按处理函数汇总耗时
+			current_source.set(getattr(getattr(handler, "__self__", None), "conference_name", None))
+			label_task(getattr(handler, "__qualname__", repr(handler)))
+			try:
+				try:
+					if self.budget is not None:
+						self.budget.check()
+					await handler(*args)
+				except BudgetExceeded as e:
+					self.stats["skipped"] += 1
+					if self.budget is not None:
+						self.budget.mark_incomplete(handler, args, e.reason)
+				except Exception as e:
+					self.stats["failed"] += 1
+					# 失败任务所属的来源-年份只有部分结果
+					owner = getattr(handler, "__self__", None)
+					if hasattr(owner, "record_failure"):
+						owner.record_failure(task_year(handler, args))
+					message = f"Task {getattr(handler, '__name__', handler)} failed: {e!r}"
+					if self.events is not None:
+						self.events.emit(ERROR, message)
+					else:
+						print(message)
+				if self.after_task is not None:
+					await self.after_task()
+				# 被取消的任务保留在 _running 中，供 pending() 报告
+				del self._running[worker]
+			finally:
+				task_label.set(None)
+				async with self._cond:
+					self._unfinished -= 1
+					self._cond.notify_all()
+
+	def pending(self):
+		"""尚未完成的任务 (handler, args)：正在执行的与仍在队列中的"""
+		items = list(self._running.values())
+		for kind in (LIST, DETAIL):
+			items.extend((handler, args) for _, _, handler, args in self._queues[kind])
+		return items
+
+	async def run(self):
+		"""启动 worker 直到队列清空且没有正在执行的任务"""
+		self._started = True
+		workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+		try:
+			await asyncio.gather(*workers)
+		finally:
+			for task in workers:
+				task.cancel()
+			await asyncio.gather(*workers, return_exceptions=True)
@@ -0,0 +1,151 @@
+import asyncio
+import gzip
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from .downloads import PDFDownloader
+from .events import FOUND, LOG, STATS
+from .frontier import Frontier
+
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def extract_text(path):
+	"""在子进程中提取 PDF 全部页面的文本（pypdf 只在子进程中导入）"""
+	from pypdf import PdfReader
+
+	reader = PdfReader(path)
+	pages = []
+	for page in reader.pages:
+		try:
+			pages.append(page.extract_text() or "")
+		except Exception:
+			# 个别页面的字体/编码损坏不影响其他页面
+			pages.append("")
+	return "\n".join(pages)
+
+
+def find_snippet(patterns, text, width=160):
+	"""返回第一个命中关键词处前后约 width 个字符的片段，未命中时返回 None"""
+	best = None
+	for pattern in patterns:
+		match = pattern.search(text)
+		if match and (best is None or match.start() < best.start()):
+			best = match
+	if best is None:
+		return None
+	half = width // 2
+	start = max(0, best.start() - half)
+	end = min(len(text), best.end() + half)
+	snippet = _WHITESPACE_RE.sub(" ", text[start:end]).strip()
+	return ("…" if start else "") + snippet + ("…" if end < len(text) else "")
+
+
+class TextCache:
+	"""按 PDF 内容哈希缓存提取出的文本（gzip），重复查询不再解析 PDF"""
+
+	def __init__(self, directory):
+		self.directory = directory
+		os.makedirs(directory, exist_ok=True)
+
+	def _path(self, digest):
+		return os.path.join(self.directory, f"{digest}.txt.gz")
+
+	def get(self, digest):
+		path = self._path(digest)
+		if not os.path.exists(path):
+			return None
+		with gzip.open(path, "rt", encoding="utf-8") as f:
+			return f.read()
+
+	def put(self, digest, text):
+		# 先写临时文件再改名，并发或中断时不会留下半个缓存文件
+		tmp = self._path(digest) + ".tmp"
+		with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=6) as f:
+			f.write(text)
+		os.replace(tmp, self._path(digest))
+
+
+class FullTextMatcher:
+	"""对标题与摘要未命中的论文下载 PDF 并在正文中匹配关键词。
+
+	PDF 经 PDFDownloader 下载（与抓取共用 session），文本提取放在进程池中进行，
+	不阻塞事件循环；提取结果按内容哈希缓存，同一批 PDF 换关键词重新查询时只需读缓存。
+	命中的行在 PaperStore 中标记为 fulltext 并保存片段。
+	"""
+
+	def __init__(self, config, retry_policy, events):
+		settings = config.get("fulltext", {}) or {}
+		self.workers = settings.get("workers") or os.cpu_count() or 1
+		self.snippet_chars = settings.get("snippet_chars", 160)
+		self.cache = TextCache(settings.get("cache_dir", ".cache/fulltext"))
+		self.downloader = PDFDownloader(config, retry_policy, events)
+		self.events = events
+		# 与爬虫的 is_match 相同：关键词按字面、忽略大小写匹配
+		self.patterns = [re.compile(re.escape(k), re.IGNORECASE) for k in config.get("keywords", [])]
+		self.stats = {"candidates": 0, "extracted": 0, "cached": 0, "matched": 0, "no_pdf": 0, "failed": 0}
+		self._pool = None
+
+	def summary(self):
+		s = self.stats
+		return (
+			f"{s['candidates']} papers checked, {s['matched']} matched in full text; "
+			f"{s['extracted']} extracted, {s['cached']} from cache, {s['no_pdf']} without PDF, {s['failed']} failed"
+		)
+
+	async def match(self, session, store, scrapers):
+		"""扫描 store 中未命中的行，返回正文命中的数量"""
+		rows = [row for row in range(len(store)) if not store.matched[row]]
+		if not rows or not self.patterns:
+			return 0
+		self.stats["candidates"] = len(rows)
+		self.events.emit(LOG, f"[Fulltext] Checking {len(rows)} papers not matched by title/abstract...")
+		owners = {scraper.conference_name: scraper for scraper in scrapers}
+
+		frontier = Frontier(workers=self.downloader.concurrency, events=self.events)
+		# spawn：事件线程仍在运行，fork 可能把其持有的锁带进子进程
+		self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+		try:
+			for row in rows:
+				await frontier.put(self._check, session, store, row, owners, key=row)
+			await frontier.run()
+		finally:
+			self._pool.shutdown(cancel_futures=True)
+			self._pool = None
+		self.stats["failed"] += frontier.stats["failed"]
+		self.events.emit(STATS, f"[Fulltext] {self.summary()}.", **self.stats)
+		return self.stats["matched"]
+
+	async def _check(self, session, store, row, owners):
+		paper = store[row]
+		path = await self.downloader.download_paper(session, paper)
+		if not path:
+			self.stats["no_pdf"] += 1
+			return
+		text = await self._text(path)
+		snippet = find_snippet(self.patterns, text, self.snippet_chars)
+		if snippet is None:
+			return
+
+		store.mark_fulltext(row, snippet)
+		self.stats["matched"] += 1
+		owner = owners.get(paper.source)
+		if owner is not None and paper.year in owner.stats:
+			owner.stats[paper.year]["found"] += 1
+		self.events.emit(
+			FOUND, source=paper.source, year=paper.year, title=paper.title, url=paper.url, matched_in="fulltext",
+		)
+
+	async def _text(self, path):
+		digest = PDFDownloader.digest_of(path)
+		text = self.cache.get(digest)
+		if text is not None:
+			self.stats["cached"] += 1
+			return text
+		text = await asyncio.get_running_loop().run_in_executor(self._pool, extract_text, path)
+		self.cache.put(digest, text)
+		self.stats["extracted"] += 1
+		return text
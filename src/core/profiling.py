@@ -0,0 +1,265 @@
+import asyncio
+import collections
+import collections.abc
+import contextvars
+import os
+import sys
+import threading
+import time
+
+from .events import LOG, STATS
+
+
+# 前沿队列在执行任务前通过 label_task 设置，按任务（而不是按 worker 协程）汇总耗时
+task_label = contextvars.ContextVar("task_label", default=None)
+
+
+def label_task(name):
+	"""标记一个新任务的开始。每次设置的都是新对象：同一 worker 连续执行的同名任务也能分开计数"""
+	task_label.set([name])
+
+
+def _qualname(obj):
+	code = getattr(obj, "cr_code", None) or getattr(obj, "gi_code", None)
+	if code is not None:
+		return getattr(code, "co_qualname", code.co_name)
+	return getattr(obj, "__qualname__", type(obj).__name__)
+
+
+def await_chain(coro):
+	"""协程当前挂起处的 await 链（由外到内），例如 Frontier._worker > ICMLScraper.process_detail:42"""
+	names = []
+	while coro is not None and len(names) < 16:
+		frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+		name = _qualname(coro)
+		names.append(f"{name}:{frame.f_lineno}" if frame is not None else name)
+		coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+	return " > ".join(names)
+
+
+class _TimedCoroutine(collections.abc.Coroutine):
+	"""包装任务的顶层协程：记录每一步（事件循环的一次回调）的墙钟时间与 CPU 时间"""
+
+	__slots__ = ("_coro", "_profiler", "top", "current", "label_start", "own_wall")
+
+	def __init__(self, coro, profiler):
+		self._coro = coro
+		self._profiler = profiler
+		self.top = _qualname(coro)
+		self.current = None
+		self.label_start = time.perf_counter()
+		# 不在任何前沿任务中的墙钟时间（worker 等待取任务等），协程结束时计入 top
+		self.own_wall = 0.0
+
+	@property
+	def label(self):
+		return self.current[0] if self.current is not None else self.top
+
+	def send(self, value):
+		return self._step(self._coro.send, value)
+
+	def throw(self, *args):
+		return self._step(self._coro.throw, *args)
+
+	def close(self):
+		return self._coro.close()
+
+	def __await__(self):
+		return self._coro.__await__()
+
+	def _step(self, method, *args):
+		# await 链必须在恢复执行前取得：它指出这一步是从哪个协程继续运行的
+		chain = await_chain(self._coro)
+		wall = time.perf_counter()
+		cpu = time.thread_time()
+		done = True
+		try:
+			result = method(*args)
+			done = False
+			return result
+		finally:
+			self._profiler.record_step(self, time.perf_counter() - wall, time.thread_time() - cpu, chain, done)
+
+
+class StackSampler:
+	"""采样 CPU 剖析：后台线程定期抓取事件循环线程的调用栈，输出 collapsed 格式
+
+	（每行 `根;...;叶 次数`），可直接交给 flamegraph.pl、speedscope 或 inferno 绘制火焰图。
+	"""
+
+	def __init__(self, interval=0.005):
+		self.interval = interval
+		self.samples = collections.Counter()
+		self._target = threading.get_ident()
+		self._stop = threading.Event()
+		self._thread = None
+
+	def start(self):
+		self._target = threading.get_ident()
+		self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+		self._thread.start()
+
+	def stop(self):
+		if self._thread is not None:
+			self._stop.set()
+			self._thread.join()
+			self._thread = None
+
+	def _run(self):
+		while not self._stop.wait(self.interval):
+			frame = sys._current_frames().get(self._target)
+			if frame is None:
+				continue
+			stack = []
+			while frame is not None:
+				code = frame.f_code
+				name = getattr(code, "co_qualname", code.co_name)
+				stack.append(f"{name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+				frame = frame.f_back
+			self.samples[";".join(reversed(stack))] += 1
+
+	def write(self, path):
+		folder = os.path.dirname(path)
+		if folder:
+			os.makedirs(folder, exist_ok=True)
+		with open(path, "w", encoding="utf-8") as f:
+			for stack, count in self.samples.most_common():
+				f.write(f"{stack} {count}\n")
+
+
+class LoopProfiler:
+	"""--profile：事件循环延迟、慢回调与按任务的墙钟/CPU 时间。
+
+	- 延迟：一个监控协程每 lag_interval 秒醒来一次，实际醒来时间与预期之差即事件循环
+	  被同步代码占用的时间；
+	- 慢回调：通过任务工厂包装每个任务的协程，单步执行超过 slow_callback 秒时记录
+	  该任务恢复执行时的 await 链（即是哪个协程在阻塞事件循环）；
+	- 按任务汇总：前沿队列以处理函数名为任务标签，统计次数、墙钟时间与 CPU 时间，
+	  CPU 占比高的任务说明耗时花在解析等同步工作上，而不是等待网络。
+	"""
+
+	def __init__(self, config, events):
+		settings = config.get("profile", {}) or {}
+		self.lag_interval = settings.get("lag_interval", 0.05)
+		self.slow_callback = settings.get("slow_callback", 0.05)
+		self.top = settings.get("top", 10)
+		self.samples_file = settings.get("samples_file")
+		self.sampler = StackSampler(settings.get("sample_interval", 0.005)) if self.samples_file else None
+		self.events = events
+		self.tasks = {}
+		self.slow = collections.Counter()
+		self.slow_max = {}
+		self.lags = []
+		self._loop = None
+		self._previous_factory = None
+		self._monitor = None
+		self._started = None
+
+	def start(self):
+		self._loop = asyncio.get_running_loop()
+		self._previous_factory = self._loop.get_task_factory()
+		self._loop.set_task_factory(self._task_factory)
+		self._monitor = asyncio.create_task(self._watch_lag())
+		self._started = time.perf_counter()
+		if self.sampler is not None:
+			self.sampler.start()
+
+	async def stop(self):
+		if self.sampler is not None:
+			self.sampler.stop()
+			self.sampler.write(self.samples_file)
+		self._monitor.cancel()
+		await asyncio.gather(self._monitor, return_exceptions=True)
+		self._loop.set_task_factory(self._previous_factory)
+		self.report()
+
+	def _task_factory(self, loop, coro, **kwargs):
+		wrapped = _TimedCoroutine(coro, self)
+		if self._previous_factory is not None:
+			return self._previous_factory(loop, wrapped, **kwargs)
+		return asyncio.Task(wrapped, loop=loop, **kwargs)
+
+	async def _watch_lag(self):
+		while True:
+			expected = time.perf_counter() + self.lag_interval
+			await asyncio.sleep(self.lag_interval)
+			self.lags.append(max(0.0, time.perf_counter() - expected))
+
+	def _task_stats(self, label):
+		stats = self.tasks.get(label)
+		if stats is None:
+			stats = self.tasks[label] = {"count": 0, "wall": 0.0, "cpu": 0.0, "steps": 0, "max_step": 0.0}
+		return stats
+
+	def record_step(self, coro, wall, cpu, chain, done):
+		now = time.perf_counter()
+		# 在任务的上下文中读取标签：前沿队列执行处理函数期间为函数名，空闲时为协程本身。
+		# 标签切换发生在这一步之内，无法细分，按这一步的开始时间划分前后两段
+		current = task_label.get()
+		if current is not coro.current:
+			self._close_segment(coro, now - wall)
+			coro.current = current
+			coro.label_start = now - wall
+		stats = self._task_stats(coro.label)
+		stats["cpu"] += cpu
+		stats["steps"] += 1
+		stats["max_step"] = max(stats["max_step"], wall)
+		if done:
+			self._close_segment(coro, now)
+			self.record_task(coro.top, coro.own_wall)
+		if wall >= self.slow_callback:
+			self.slow[chain] += 1
+			self.slow_max[chain] = max(self.slow_max.get(chain, 0.0), wall)
+
+	def _close_segment(self, coro, end):
+		if coro.current is not None:
+			self.record_task(coro.label, end - coro.label_start)
+		else:
+			coro.own_wall += end - coro.label_start
+
+	def record_task(self, label, wall):
+		stats = self._task_stats(label)
+		stats["count"] += 1
+		stats["wall"] += wall
+
+	def lag_summary(self):
+		if not self.lags:
+			return {"samples": 0, "mean": 0.0, "p99": 0.0, "max": 0.0}
+		lags = sorted(self.lags)
+		return {
+			"samples": len(lags),
+			"mean": sum(lags) / len(lags),
+			"p99": lags[min(len(lags) - 1, int(len(lags) * 0.99))],
+			"max": lags[-1],
+		}
+
+	def report(self):
+		elapsed = time.perf_counter() - self._started
+		lag = self.lag_summary()
+		self.events.emit(
+			STATS,
+			f"[Profile] Event-loop lag over {elapsed:.1f}s: mean {lag['mean'] * 1000:.1f} ms, "
+			f"p99 {lag['p99'] * 1000:.1f} ms, max {lag['max'] * 1000:.1f} ms ({lag['samples']} samples)",
+			scope="profile.lag", **lag,
+		)
+
+		ranked = sorted(self.tasks.items(), key=lambda item: item[1]["cpu"], reverse=True)[:self.top]
+		for label, stats in ranked:
+			share = stats["cpu"] / stats["wall"] if stats["wall"] else 0.0
+			self.events.emit(
+				STATS,
+				f"[Profile] {label}: {stats['count']} tasks, wall {stats['wall']:.2f}s, cpu {stats['cpu']:.2f}s "
+				f"({share:.0%} on CPU), slowest step {stats['max_step'] * 1000:.1f} ms",
+				scope="profile.task", label=label, **stats,
+			)
+
+		for chain, count in self.slow.most_common(self.top):
+			self.events.emit(
+				STATS,
+				f"[Profile] Slow callback x{count} (max {self.slow_max[chain] * 1000:.1f} ms): {chain}",
+				scope="profile.slow", chain=chain, count=count, max=self.slow_max[chain],
+			)
+		if self.sampler is not None:
+			self.events.emit(
+				LOG, f"[Profile] {sum(self.sampler.samples.values())} stack samples written to {self.samples_file}",
+			)
@@ -0,0 +1,177 @@
+import math
+import re
+
+import numpy as np
+
+
+# 关键词切分为检索词：与正文分词规则一致（ASCII 字母数字，非 ASCII 字节视为词内字符）
+_TERM_RE = re.compile(r"[0-9a-z\u0080-\U0010ffff]+")
+
+DEFAULT_FIELDS = {"title": 2.0, "abstract": 1.0}
+
+
+def query_terms(keywords):
+	"""把关键词拆成去重后的小写检索词，例如 "AI Scientist" -> ["ai", "scientist"]"""
+	terms = []
+	for keyword in keywords or []:
+		for term in _TERM_RE.findall(keyword.lower()):
+			if term not in terms:
+				terms.append(term)
+	return terms
+
+
+# 分词映射：ASCII 大写转小写，字母数字与非 ASCII 字节（UTF-8 多字节字符）视为词内字符原样保留，
+# 其余字节映射为 0，一次 translate 同时完成小写化与断词
+_TOKEN_BYTES = bytes(
+	i + 32 if 65 <= i <= 90 else i if (48 <= i <= 57 or 97 <= i <= 122 or i >= 128) else 0
+	for i in range(256)
+)
+
+
+def _pack(chunk, size=8):
+	return np.dtype(f"<u{size}").type(int.from_bytes(chunk.ljust(size, b"\0"), "little"))
+
+
+def _mask(length, size=8):
+	return np.dtype(f"<u{size}").type((1 << (8 * min(length, size))) - 1)
+
+
+class _FieldIndex:
+	"""对一个 TextColumn 的字节缓冲做向量化分词：求每行词数，并取出每个词的前 4 个字节。
+
+	不为每篇论文创建 Python 字符串或词表：文本列本身就是一块连续的字节缓冲，一次 translate
+	完成小写化并把非词字符置 0；词首与每行词数由 NumPy 数组运算得到。每个词首处的 4 个
+	字节打包成一个 uint32，检索一个词先在该数组上做一次掩码比较（短词连同词尾的 0 字节），
+	更长的词再按 8 字节一段核对少量候选。行与行之间没有分隔字节：行首总是词首，
+	比较不越过行尾。
+	"""
+
+	def __init__(self, column):
+		offsets = np.frombuffer(column.offsets, dtype=np.uint64).astype(np.int64)
+		self.rows = len(offsets) - 1
+		# 直接在拼接好的缓冲上分词（不再逐行切片、插入分隔符），末尾补 8 字节便于按 uint64 读取
+		buffer = column.data.translate(_TOKEN_BYTES)
+		buffer.extend(bytes(8))
+		self.row_starts = offsets
+		self.buffer = np.frombuffer(buffer, dtype=np.uint8)
+		# 以 1 字节步长把缓冲看作 uint64 序列：第 i 项是从第 i 个字节开始的 8 个字节
+		self.chunks = np.ndarray((len(buffer) - 7,), dtype="<u8", buffer=buffer, strides=(1,))
+
+		word = self.buffer != 0
+		first = np.zeros(len(word), dtype=bool)
+		np.greater(word[1:], word[:-1], out=first[1:])
+		first[0] = word[0]
+		# 上一行以词内字符结尾时，本行的第一个词也要单独计数
+		first[offsets[:-1]] = word[offsets[:-1]]
+		del word
+		self.starts = np.flatnonzero(first)
+		del first
+		# 每行第一个词在 starts 中的下标（末项为词总数）
+		firsts = np.searchsorted(self.starts, offsets)
+		self.lengths = np.diff(firsts).astype(np.float64)
+		# 词首 4 字节（比 uint64 少一半数据量），检索时据此筛出候选
+		self.heads = np.ndarray((len(buffer) - 3,), dtype="<u4", buffer=buffer, strides=(1,))[self.starts]
+		self._clip_row_ends(offsets, firsts)
+		self._scratch = np.empty_like(self.heads)
+		self._found = np.empty(len(self.heads), dtype=bool)
+
+	def _clip_row_ends(self, offsets, firsts):
+		"""离行尾不足 4 字节的词：把 heads 中行尾之后（属于下一行）的字节置 0，当作词尾。
+
+		词与分隔字节各至少 1 字节，每行至多最后 2 个词会落在行尾 3 字节内。
+		"""
+		ends = offsets[1:]
+		for back in (1, 2):
+			tokens = firsts[1:] - back
+			valid = tokens >= firsts[:-1]
+			tokens = tokens[valid]
+			remaining = ends[valid] - self.starts[tokens]
+			near = remaining < 4
+			tokens, remaining = tokens[near], remaining[near].astype(np.uint32)
+			self.heads[tokens] &= np.left_shift(np.uint32(1), remaining * np.uint32(8)) - np.uint32(1)
+
+	def term_frequency(self, term):
+		"""term 作为完整词出现在每一行中的次数"""
+		tf = np.zeros(self.rows, dtype=np.float64)
+		needle = term.encode("utf-8")
+		if not self.rows or not needle:
+			return tf
+		# 先比较词首 4 字节；短词连同其后的 0 字节一起比较，保证是完整的词而不是前缀
+		head = needle[:4] if len(needle) >= 4 else needle + b"\0"
+		np.bitwise_and(self.heads, _mask(len(head), 4), out=self._scratch)
+		np.equal(self._scratch, _pack(head, 4), out=self._found)
+		hits = self.starts[self._found]
+		rows = np.searchsorted(self.row_starts, hits, side="right") - 1
+		if len(needle) >= 4:
+			# 候选逐段核对其余字节，且词必须在本行内结束：恰好到行尾，或其后是非词字符
+			for i in range(4, len(needle), 8):
+				part = needle[i:i + 8]
+				keep = (self.chunks[hits + i] & _mask(len(part))) == _pack(part)
+				hits, rows = hits[keep], rows[keep]
+			end = hits + len(needle)
+			row_ends = self.row_starts[rows + 1]
+			keep = (end <= row_ends) & ((end == row_ends) | (self.buffer[end] == 0))
+			rows = rows[keep]
+		tf += np.bincount(rows, minlength=self.rows)
+		return tf
+
+
+class BM25Ranker:
+	"""BM25F 相关度排序：标题与摘要按字段加权、分别做长度归一后合并词频。
+
+	score(d) = Σ_t idf(t) · tf'(t, d) / (k1 + tf'(t, d))
+	tf'(t, d) = Σ_f w_f · tf_f(t, d) / (1 - b + b · len_f(d) / avglen_f)
+
+	文档频率与平均长度基于所有扫描到的论文（不只是命中的论文）计算。
+	"""
+
+	def __init__(self, config):
+		settings = config.get("ranking", {}) or {}
+		self.k1 = settings.get("k1", 1.2)
+		self.b = settings.get("b", 0.75)
+		self.fields = dict(settings.get("fields") or DEFAULT_FIELDS)
+		self.terms = query_terms(config.get("keywords", []))
+
+	def score(self, store):
+		"""返回 store 中每一行的得分（float64 数组，与行号对齐）"""
+		n = len(store)
+		scores = np.zeros(n, dtype=np.float64)
+		if not n or not self.terms:
+			return scores
+
+		columns = {"title": store.titles, "abstract": store.abstracts}
+		indexes = []
+		for name, weight in self.fields.items():
+			if name not in columns or not weight:
+				continue
+			index = _FieldIndex(columns[name])
+			avg = index.lengths.mean() or 1.0
+			norm = 1.0 - self.b + self.b * index.lengths / avg
+			indexes.append((index, weight / norm))
+
+		for term in self.terms:
+			tf = np.zeros(n, dtype=np.float64)
+			for index, factor in indexes:
+				tf += index.term_frequency(term) * factor
+			df = np.count_nonzero(tf)
+			if not df:
+				continue
+			idf = math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+			scores += idf * tf / (self.k1 + tf)
+		return scores
+
+	def rank(self, store, matched_only=True, top_k=None):
+		"""按得分降序返回 Paper 列表（带 score），top_k 限制返回数量"""
+		scores = self.score(store)
+		rows = np.asarray(store.rows(matched_only=matched_only), dtype=np.int64)
+		if not len(rows):
+			return []
+		order = rows[np.argsort(-scores[rows], kind="stable")]
+		if top_k:
+			order = order[:top_k]
+		papers = []
+		for row in order:
+			paper = store[int(row)]
+			paper.score = float(scores[row])
+			papers.append(paper)
+		return papers
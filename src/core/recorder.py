@@ -0,0 +1,235 @@
+import gzip
+import hashlib
+import json
+import os
+import time
+
+import aiohttp
+from multidict import CIMultiDict
+from yarl import URL
+
+
+def _canonical_url(url, params=None):
+	"""把 URL 与 params 合并并按键排序，保证同一请求得到同一个 key"""
+	u = URL(str(url))
+	query = list(u.query.items())
+	if params:
+		items = params.items() if isinstance(params, dict) else params
+		query.extend((str(k), str(v)) for k, v in items)
+	query.sort()
+	return str(u.with_query(query))
+
+
+def request_key(method, url, params=None, headers=None):
+	"""method + URL + params (+ Range) 的稳定摘要"""
+	parts = [method.upper(), _canonical_url(url, params)]
+	range_header = (headers or {}).get("Range")
+	if range_header:
+		parts.append(f"range={range_header}")
+	return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+class ReplayMissError(LookupError):
+	"""回放时找不到对应录制；不属于网络错误，不会触发重试"""
+
+
+class CaptureStore:
+	"""录制目录：index.jsonl 记录元数据，bodies/<key>.gz 存放压缩后的响应体"""
+
+	def __init__(self, root):
+		self.root = root
+		self.index_path = os.path.join(root, "index.jsonl")
+		self.bodies_dir = os.path.join(root, "bodies")
+		self.entries = {}
+
+	def open_for_record(self):
+		os.makedirs(self.bodies_dir, exist_ok=True)
+		with open(os.path.join(self.root, "meta.json"), "w", encoding="utf-8") as f:
+			json.dump({"created": time.strftime("%Y-%m-%d %H:%M:%S"), "format": 1}, f)
+		# 重新录制时覆盖旧索引
+		open(self.index_path, "w", encoding="utf-8").close()
+		return self
+
+	def open_for_replay(self):
+		if not os.path.exists(self.index_path):
+			raise FileNotFoundError(f"No capture index found at {self.index_path}")
+		with open(self.index_path, "r", encoding="utf-8") as f:
+			for line in f:
+				line = line.strip()
+				if line:
+					entry = json.loads(line)
+					self.entries[entry["key"]] = entry
+		return self
+
+	def put(self, key, method, url, status, headers, body):
+		with gzip.open(os.path.join(self.bodies_dir, f"{key}.gz"), "wb") as f:
+			f.write(body)
+		entry = {
+			"key": key,
+			"method": method,
+			"url": url,
+			"status": status,
+			"headers": dict(headers),
+		}
+		self.entries[key] = entry
+		with open(self.index_path, "a", encoding="utf-8") as f:
+			f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+	def get(self, key):
+		entry = self.entries.get(key)
+		if entry is None:
+			return None
+		with gzip.open(os.path.join(self.bodies_dir, f"{key}.gz"), "rb") as f:
+			body = f.read()
+		return entry, body
+
+
+class _BodyStream:
+	"""模拟 resp.content (StreamReader) 的分块读取接口"""
+
+	def __init__(self, body):
+		self._body = body
+		self._pos = 0
+
+	async def read(self, n=-1):
+		end = len(self._body) if n < 0 else self._pos + n
+		data = self._body[self._pos:end]
+		self._pos += len(data)
+		return data
+
+	async def iter_chunked(self, n):
+		while self._pos < len(self._body):
+			yield await self.read(n)
+
+
+class RecordedResponse:
+	"""与 aiohttp.ClientResponse 常用接口兼容的内存响应"""
+
+	def __init__(self, method, url, status, headers, body):
+		self.method = method
+		self.url = URL(url)
+		self.status = status
+		self.headers = CIMultiDict(headers or {})
+		self._body = body
+		self.content = _BodyStream(body)
+
+	@property
+	def charset(self):
+		content_type = self.headers.get("Content-Type", "")
+		for part in content_type.split(";")[1:]:
+			name, _, value = part.strip().partition("=")
+			if name.lower() == "charset" and value:
+				return value.strip('"')
+		return None
+
+	async def read(self):
+		return self._body
+
+	async def text(self, encoding=None, errors="strict"):
+		return self._body.decode(encoding or self.charset or "utf-8", errors)
+
+	async def json(self, **kwargs):
+		return json.loads(await self.text())
+
+	def raise_for_status(self):
+		if self.status >= 400:
+			info = aiohttp.RequestInfo(self.url, self.method, CIMultiDict(), self.url)
+			raise aiohttp.ClientResponseError(info, (), status=self.status, message="", headers=self.headers)
+
+	def release(self):
+		pass
+
+	async def __aenter__(self):
+		return self
+
+	async def __aexit__(self, exc_type, exc, tb):
+		self.release()
+
+
+class _RequestContext:
+	def __init__(self, coro):
+		self._coro = coro
+		self._resp = None
+
+	async def __aenter__(self):
+		self._resp = await self._coro
+		return self._resp
+
+	async def __aexit__(self, exc_type, exc, tb):
+		if self._resp is not None:
+			self._resp.release()
+
+
+class RecordingSession:
+	"""透传到真实 ClientSession，同时把每个响应写入 CaptureStore"""
+
+	def __init__(self, session, store):
+		self._session = session
+		self.store = store
+
+	def get(self, url, **kwargs):
+		return self.request("GET", url, **kwargs)
+
+	def request(self, method, url, **kwargs):
+		return _RequestContext(self._record(method, url, **kwargs))
+
+	async def _record(self, method, url, **kwargs):
+		key = request_key(method, url, kwargs.get("params"), kwargs.get("headers"))
+		async with self._session.request(method, url, **kwargs) as resp:
+			body = await resp.read()
+			status = resp.status
+			headers = dict(resp.headers)
+			real_url = str(resp.url)
+		# 已按 Content-Encoding 解压，回放时不应再声明压缩
+		headers.pop("Content-Encoding", None)
+		headers.pop("Content-Length", None)
+		self.store.put(key, method.upper(), real_url, status, headers, body)
+		return RecordedResponse(method.upper(), real_url, status, headers, body)
+
+	@property
+	def closed(self):
+		return self._session.closed
+
+	async def close(self):
+		await self._session.close()
+
+	async def __aenter__(self):
+		return self
+
+	async def __aexit__(self, exc_type, exc, tb):
+		await self.close()
+
+
+class ReplaySession:
+	"""只从 CaptureStore 返回响应，不产生任何网络请求"""
+
+	def __init__(self, store):
+		self.store = store
+		self._closed = False
+
+	def get(self, url, **kwargs):
+		return self.request("GET", url, **kwargs)
+
+	def request(self, method, url, **kwargs):
+		return _RequestContext(self._replay(method, url, **kwargs))
+
+	async def _replay(self, method, url, **kwargs):
+		key = request_key(method, url, kwargs.get("params"), kwargs.get("headers"))
+		hit = self.store.get(key)
+		if hit is None:
+			raise ReplayMissError(f"No recorded response for {method.upper()} {_canonical_url(url, kwargs.get('params'))}")
+		entry, body = hit
+		return RecordedResponse(entry["method"], entry["url"], entry["status"], entry["headers"], body)
+
+	@property
+	def closed(self):
+		return self._closed
+
+	async def close(self):
+		self._closed = True
+
+	async def __aenter__(self):
+		return self
+
+	async def __aexit__(self, exc_type, exc, tb):
+		await self.close()
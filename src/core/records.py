@@ -0,0 +1,197 @@
+import sys
+from array import array
+
+
+UNKNOWN_AUTHORS = "Unknown Authors"
+
+
+class Paper:
+	"""紧凑的论文记录：__slots__ 避免实例字典，source 与作者名为驻留字符串"""
+
+	__slots__ = (
+		"source", "year", "title", "authors", "abstract", "url", "score", "pdf_url",
+		"doi", "openalex_id", "cited_by", "pdf_path", "matched_in", "snippet",
+	)
+
+	def __init__(self, source, year, title, authors, abstract, url, score=None, pdf_url=None):
+		self.source = sys.intern(source)
+		self.year = year
+		self.title = title
+		self.authors = tuple(sys.intern(a) for a in authors)
+		self.abstract = abstract
+		self.url = url
+		self.score = score
+		self.pdf_url = pdf_url or None
+		# OpenAlex 补全的标识与引用数，未补全时为 None
+		self.doi = None
+		self.openalex_id = None
+		self.cited_by = None
+		# 下载阶段写入的本地 PDF 路径
+		self.pdf_path = None
+		# 仅在正文中命中时为 "fulltext"，snippet 为命中处的上下文
+		self.matched_in = None
+		self.snippet = None
+
+	@property
+	def authors_text(self):
+		return ", ".join(self.authors) if self.authors else UNKNOWN_AUTHORS
+
+	def to_dict(self):
+		data = {
+			"source": self.source,
+			"year": self.year,
+			"title": self.title,
+			"authors": self.authors_text,
+			"abstract": self.abstract,
+			"url": self.url,
+		}
+		if self.score is not None:
+			data["score"] = round(self.score, 4)
+		for name in ("pdf_url", "doi", "openalex_id", "cited_by", "pdf_path", "matched_in", "snippet"):
+			value = getattr(self, name)
+			if value is not None:
+				data[name] = value
+		return data
+
+	def __repr__(self):
+		return f"Paper({self.source!r}, {self.year!r}, {self.title[:40]!r})"
+
+
+class StringTable:
+	"""去重字符串表：相同字符串只存一份，列中只保存其下标"""
+
+	def __init__(self):
+		self.strings = []
+		self._index = {}
+
+	def add(self, text):
+		idx = self._index.get(text)
+		if idx is None:
+			idx = len(self.strings)
+			text = sys.intern(text)
+			self.strings.append(text)
+			self._index[text] = idx
+		return idx
+
+	def __getitem__(self, idx):
+		return self.strings[idx]
+
+	def __len__(self):
+		return len(self.strings)
+
+
+class TextColumn:
+	"""按 UTF-8 拼接存储的文本列，偏移量保存在 array 中，每行不再是独立的 str 对象"""
+
+	def __init__(self):
+		self.data = bytearray()
+		self.offsets = array("Q", [0])
+
+	def append(self, text):
+		self.data += text.encode("utf-8")
+		self.offsets.append(len(self.data))
+
+	def __getitem__(self, row):
+		return self.data[self.offsets[row]:self.offsets[row + 1]].decode("utf-8")
+
+	def __len__(self):
+		return len(self.offsets) - 1
+
+	@property
+	def nbytes(self):
+		return len(self.data) + self.offsets.itemsize * len(self.offsets)
+
+
+class PaperStore:
+	"""列式论文存储：扫描到的每篇论文占一行，matched 标记是否命中关键词。
+
+	source 与作者名进入字符串表，每行只保存下标；作者列表用 author_ids +
+	author_offsets 表示（CSR 形式）；标题、摘要、URL 与 PDF 链接为拼接的文本列。
+	"""
+
+	def __init__(self):
+		self.sources = StringTable()
+		self.names = StringTable()
+		self.source_ids = array("H")
+		self.years = array("H")
+		self.matched = bytearray()
+		self.author_ids = array("I")
+		self.author_offsets = array("Q", [0])
+		self.titles = TextColumn()
+		self.abstracts = TextColumn()
+		self.urls = TextColumn()
+		self.pdf_urls = TextColumn()
+		# 正文命中的行号 -> 片段（稀疏，只有少数论文仅在正文中命中）
+		self.fulltext = {}
+
+	def append(self, source, year, title, authors, abstract, url, matched=False, pdf_url=None):
+		"""追加一行并返回行号"""
+		self.source_ids.append(self.sources.add(source))
+		self.years.append(year or 0)
+		self.matched.append(1 if matched else 0)
+		for name in authors:
+			self.author_ids.append(self.names.add(name))
+		self.author_offsets.append(len(self.author_ids))
+		self.titles.append(title or "")
+		self.abstracts.append(abstract or "")
+		self.urls.append(url or "")
+		self.pdf_urls.append(pdf_url or "")
+		return len(self.matched) - 1
+
+	def add(self, paper, matched=False):
+		return self.append(
+			paper.source, paper.year, paper.title, paper.authors, paper.abstract, paper.url, matched, paper.pdf_url,
+		)
+
+	def mark_fulltext(self, row, snippet):
+		"""标记某行因正文命中关键词而匹配"""
+		self.matched[row] = 1
+		self.fulltext[row] = snippet
+
+	def authors(self, row):
+		start, end = self.author_offsets[row], self.author_offsets[row + 1]
+		return [self.names[i] for i in self.author_ids[start:end]]
+
+	def __len__(self):
+		return len(self.matched)
+
+	def __getitem__(self, row):
+		if row < 0:
+			row += len(self)
+		paper = Paper(
+			self.sources[self.source_ids[row]],
+			self.years[row] or None,
+			self.titles[row],
+			self.authors(row),
+			self.abstracts[row],
+			self.urls[row],
+			pdf_url=self.pdf_urls[row],
+		)
+		snippet = self.fulltext.get(row)
+		if snippet is not None:
+			paper.matched_in = "fulltext"
+			paper.snippet = snippet
+		return paper
+
+	def __iter__(self):
+		for row in range(len(self)):
+			yield self[row]
+
+	def rows(self, matched_only=False):
+		if not matched_only:
+			return range(len(self))
+		return [row for row, flag in enumerate(self.matched) if flag]
+
+	def matches(self):
+		"""依次返回所有命中关键词的论文"""
+		for row in self.rows(matched_only=True):
+			yield self[row]
+
+	@property
+	def nbytes(self):
+		arrays = (self.source_ids, self.years, self.author_ids, self.author_offsets)
+		return (
+			sum(a.itemsize * len(a) for a in arrays)
+			+ len(self.matched)
+			+ self.titles.nbytes + self.abstracts.nbytes + self.urls.nbytes + self.pdf_urls.nbytes
+		)
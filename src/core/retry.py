@@ -0,0 +1,188 @@
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+
+import aiohttp
+from yarl import URL
+
+from .events import ERROR
+
+
+# 值得重试的状态码：限流与服务端临时错误
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+class RetryableError(Exception):
+	"""read 回调可抛出此异常，请求按临时失败处理（例如响应体不完整）"""
+
+
+def parse_retry_after(value):
+	"""Retry-After 支持秒数或 HTTP 日期两种格式"""
+	if not value:
+		return None
+	value = value.strip()
+	if value.isdigit():
+		return float(value)
+	try:
+		return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+	except (TypeError, ValueError):
+		return None
+
+
+class CircuitBreaker:
+	"""按 host 的熔断器：连续失败达到阈值后暂停该 host，冷却结束后半开放行。
+
+	半开状态下只放行一个探测请求，其余请求继续等待：探测成功则恢复，失败则立即重新熔断
+	（冷却时间指数增长），不会在每次冷却结束时让排队的请求一起打到仍在故障的 host 上。
+	"""
+
+	def __init__(self, threshold=5, cooldown=30.0, max_cooldown=300.0):
+		self.threshold = threshold
+		self.cooldown = cooldown
+		self.max_cooldown = max_cooldown
+		self.failures = {}
+		self.open_until = {}
+		self.trips = {}
+		# 半开状态下正在进行的探测：host -> 探测结束时触发的 Event
+		self.probes = {}
+		self.events = None
+
+	async def wait(self, host):
+		"""熔断期间挂起调用方，而不是让队列里的请求逐个失败。
+
+		返回探测令牌：调用方是半开状态下的探测请求时为非 None，请求结束后须调用 release。
+		"""
+		while True:
+			if host not in self.open_until:
+				return None
+			remaining = self.open_until[host] - time.monotonic()
+			if remaining > 0:
+				await asyncio.sleep(remaining)
+				continue
+			probe = self.probes.get(host)
+			if probe is None:
+				probe = self.probes[host] = asyncio.Event()
+				return probe
+			await probe.wait()
+
+	def release(self, host, probe=None):
+		"""结束探测；探测请求没有得出结果（被取消、非临时错误等）时由下一个等待者继续探测"""
+		current = self.probes.get(host)
+		if current is not None and (probe is None or probe is current):
+			del self.probes[host]
+			current.set()
+
+	def record_success(self, host):
+		self.failures[host] = 0
+		self.trips[host] = 0
+		# 熔断期间返回的旧请求不提前结束冷却；冷却结束后（半开）的成功使 host 恢复
+		if self.open_until.get(host, 0) <= time.monotonic():
+			self.open_until.pop(host, None)
+			self.release(host)
+
+	def record_failure(self, host):
+		"""返回 True 表示这次失败触发了熔断"""
+		count = self.failures.get(host, 0) + 1
+		self.failures[host] = count
+		half_open = host in self.probes
+		if count < self.threshold and not half_open:
+			return False
+		trips = self.trips.get(host, 0)
+		delay = min(self.max_cooldown, self.cooldown * (2 ** trips))
+		self.open_until[host] = time.monotonic() + delay
+		self.trips[host] = trips + 1
+		self.failures[host] = 0
+		self.release(host)
+		if half_open:
+			message = f"Circuit re-opened for {host}: probe failed, pausing {delay:.1f}s"
+		else:
+			message = f"Circuit open for {host}: pausing {delay:.1f}s after {count} consecutive failures"
+		if self.events is not None:
+			self.events.emit(ERROR, message, host=host)
+		else:
+			print(f"⚠️  {message}")
+		return True
+
+
+class RetryPolicy:
+	"""共享的重试策略：指数退避 + 抖动、重试预算、Retry-After 与按 host 熔断"""
+
+	def __init__(self, config):
+		options = config.get("retry") or {}
+		self.max_attempts = options.get("max_attempts", 4)
+		self.base_delay = options.get("base_delay", 1.0)
+		self.max_delay = options.get("max_delay", 60.0)
+		# 重试预算：总重试次数不超过 min_budget + budget_ratio * 请求数
+		self.budget_ratio = options.get("budget_ratio", 0.2)
+		self.min_budget = options.get("min_budget", 20)
+		self.breaker = CircuitBreaker(
+			threshold=options.get("breaker_threshold", 5),
+			cooldown=options.get("breaker_cooldown", 30.0),
+		)
+		self.stats = {"requests": 0, "retries": 0, "gave_up": 0, "circuit_opens": 0}
+		# 引擎注入的 CrawlBudget：每次发出请求前检查并记账，耗尽时抛出 BudgetExceeded
+		self.budget = None
+
+	def backoff(self, attempt, retry_after=None):
+		# full jitter：在 [0, base * 2^attempt] 内均匀取值
+		delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+		if retry_after is not None:
+			delay = max(delay, min(retry_after, self.max_delay))
+		return delay
+
+	def _take_budget(self):
+		allowed = self.min_budget + self.budget_ratio * self.stats["requests"]
+		return self.stats["retries"] < allowed
+
+	async def request(self, session, url, read, method="GET", **kwargs):
+		"""发起请求并在临时失败时重试。
+
+		read(resp) 在得到最终响应（非重试状态，或重试耗尽）时调用，其返回值作为结果；
+		网络异常在重试耗尽后原样抛出。
+		"""
+		host = URL(str(url)).host
+		attempt = 0
+		while True:
+			probe = await self.breaker.wait(host)
+			try:
+				if self.budget is not None:
+					self.budget.charge_request()
+				self.stats["requests"] += 1
+				retry_after = None
+				final = False
+				try:
+					async with session.request(method, url, **kwargs) as resp:
+						if resp.status not in RETRYABLE_STATUS:
+							result = await read(resp)
+							self.breaker.record_success(host)
+							return result
+						retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+						if not self._can_retry(attempt):
+							final = True
+							self.stats["gave_up"] += 1
+							self._record_failure(host)
+							return await read(resp)
+				except (aiohttp.ClientError, asyncio.TimeoutError, RetryableError) as e:
+					# 重试耗尽后的最终响应，或 read 主动抛出的非临时错误（如 404）不再重试
+					if final or (isinstance(e, aiohttp.ClientResponseError) and e.status not in RETRYABLE_STATUS):
+						raise
+					if not self._can_retry(attempt):
+						self.stats["gave_up"] += 1
+						self._record_failure(host)
+						raise
+
+				self._record_failure(host)
+			finally:
+				if probe is not None:
+					self.breaker.release(host, probe)
+			attempt += 1
+			self.stats["retries"] += 1
+			await asyncio.sleep(self.backoff(attempt, retry_after))
+
+	def _can_retry(self, attempt):
+		return attempt + 1 < self.max_attempts and self._take_budget()
+
+	def _record_failure(self, host):
+		if self.breaker.record_failure(host):
+			self.stats["circuit_opens"] += 1
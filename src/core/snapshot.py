@@ -0,0 +1,322 @@
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import time
+import zlib
+from array import array
+
+from .records import Paper, StringTable
+
+
+# 文件头：魔数、格式版本、保留字段、元数据（JSON）的偏移与长度
+MAGIC = b"PTSNAP\r\n"
+VERSION = 1
+SUFFIX = ".ptsnap"
+_HEADER = struct.Struct("<8sHHQQ")
+# 文本列按行分块压缩，随机读取一行只需解压所在的块
+BLOCK_ROWS = 256
+TEXT_COLUMNS = ("titles", "abstracts", "urls", "pdf_urls")
+
+
+def snapshot_name(source, year):
+	"""快照文件名，例如 icml_2024.ptsnap"""
+	slug = re.sub(r"[^0-9a-z_-]+", "", "-".join(source.lower().split()))
+	return f"{slug or 'source'}_{year}{SUFFIX}"
+
+
+def find_snapshots(paths):
+	"""展开文件与目录（目录中的 *.ptsnap），保持给定顺序并去重"""
+	found = []
+	for path in paths:
+		if os.path.isdir(path):
+			names = sorted(name for name in os.listdir(path) if name.endswith(SUFFIX))
+			candidates = [os.path.join(path, name) for name in names]
+		else:
+			candidates = [path]
+		for candidate in candidates:
+			if candidate not in found:
+				found.append(candidate)
+	return found
+
+
+class _SnapshotWriter:
+	def __init__(self, f):
+		self.f = f
+		self.sections = {}
+
+	def _align(self):
+		pad = -self.f.tell() % 8
+		if pad:
+			self.f.write(bytes(pad))
+
+	def section(self, name, data):
+		# 数组段按 8 字节对齐，读取时可直接在映射上按类型解释
+		self._align()
+		self.sections[name] = [self.f.tell(), len(data)]
+		self.f.write(data)
+
+	def text(self, name, texts, level):
+		"""写入一个文本列：行偏移（未压缩）、块偏移与按 BLOCK_ROWS 行分块压缩的数据"""
+		offsets = array("Q", [0])
+		blocks = array("Q", [0])
+		compressed = bytearray()
+		raw = bytearray()
+		size = 0
+		for i, text in enumerate(texts, 1):
+			encoded = text.encode("utf-8")
+			raw += encoded
+			size += len(encoded)
+			offsets.append(size)
+			if i % BLOCK_ROWS == 0:
+				compressed += zlib.compress(raw, level)
+				blocks.append(len(compressed))
+				raw.clear()
+		# 最后一个不满的块即使全是空字符串也要写出，块数始终为 ceil(行数 / BLOCK_ROWS)
+		if (len(offsets) - 1) % BLOCK_ROWS or len(offsets) == 1:
+			compressed += zlib.compress(raw, level)
+			blocks.append(len(compressed))
+		self.section(f"{name}.offsets", offsets.tobytes())
+		self.section(f"{name}.blocks", blocks.tobytes())
+		self.section(f"{name}.data", bytes(compressed))
+
+
+def write_snapshot(path, store, rows, source, year, keywords=None, level=9):
+	"""把 store 中的 rows（同一来源-年份扫描到的全部论文）写成一个快照文件，返回文件大小。
+
+	keywords 只在来源的抓取结果依赖关键词时（如 arXiv 查询）写入，导入时据此判断能否复用。
+	"""
+	names = StringTable()
+	author_ids = array("I")
+	author_offsets = array("Q", [0])
+	for row in rows:
+		for name in store.authors(row):
+			author_ids.append(names.add(name))
+		author_offsets.append(len(author_ids))
+
+	folder = os.path.dirname(path)
+	if folder:
+		os.makedirs(folder, exist_ok=True)
+	# 先写临时文件再改名，中断时不会留下半个快照
+	tmp = path + ".tmp"
+	with open(tmp, "wb") as f:
+		f.write(bytes(_HEADER.size))
+		writer = _SnapshotWriter(f)
+		writer.section("author_offsets", author_offsets.tobytes())
+		writer.section("author_ids", author_ids.tobytes())
+		writer.text("names", names.strings, level)
+		for column in TEXT_COLUMNS:
+			values = getattr(store, column)
+			writer.text(column, (values[row] for row in rows), level)
+
+		meta = {
+			"source": source,
+			"year": year,
+			"rows": len(rows),
+			"created": time.strftime("%Y-%m-%d %H:%M:%S"),
+			"keywords": list(keywords) if keywords is not None else None,
+			"byteorder": sys.byteorder,
+			"codec": "zlib",
+			"block_rows": BLOCK_ROWS,
+			"sections": writer.sections,
+		}
+		encoded = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+		offset = f.tell()
+		f.write(encoded)
+		size = f.tell()
+		f.seek(0)
+		f.write(_HEADER.pack(MAGIC, VERSION, 0, offset, len(encoded)))
+	os.replace(tmp, path)
+	return size
+
+
+def _release(values):
+	# 映射上的视图必须先释放，mmap 才能关闭
+	if isinstance(values, memoryview):
+		values.release()
+
+
+class _MappedText:
+	"""快照中的一个文本列：偏移数组直接映射，数据块按需解压（缓存最近一块）"""
+
+	def __init__(self, snapshot, name):
+		self.offsets = snapshot._array(f"{name}.offsets", "Q")
+		self.blocks = snapshot._array(f"{name}.blocks", "Q")
+		start, length = snapshot._section(f"{name}.data")
+		self.data = snapshot._view[start:start + length]
+		self.block_rows = snapshot.block_rows
+		if len(self.blocks) - 1 != max(1, -(-len(self) // self.block_rows)):
+			self.release()
+			raise ValueError(f"Corrupt snapshot ({name} has the wrong number of blocks): {snapshot.path}")
+		self._block = None
+		self._raw = b""
+
+	def block(self, index):
+		if index != self._block:
+			self._raw = zlib.decompress(self.data[self.blocks[index]:self.blocks[index + 1]])
+			self._block = index
+		return self._raw
+
+	def __getitem__(self, row):
+		index = row // self.block_rows
+		base = self.offsets[index * self.block_rows]
+		raw = self.block(index)
+		return raw[self.offsets[row] - base:self.offsets[row + 1] - base].decode("utf-8")
+
+	def __len__(self):
+		return len(self.offsets) - 1
+
+	def __iter__(self):
+		"""顺序读取：每块只解压一次"""
+		for index in range(len(self.blocks) - 1):
+			raw = self.block(index)
+			first = index * self.block_rows
+			base = self.offsets[first]
+			for row in range(first, min(first + self.block_rows, len(self))):
+				yield raw[self.offsets[row] - base:self.offsets[row + 1] - base].decode("utf-8")
+
+	def release(self):
+		for values in (self.offsets, self.blocks, self.data):
+			_release(values)
+		self._raw = b""
+
+
+class Snapshot:
+	"""以内存映射方式打开的快照：只解析文件头与元数据，论文按行或按块读取。
+
+		with Snapshot("snapshots/icml_2024.ptsnap") as snapshot:
+			for paper in snapshot.matches(["quantum"]):
+				print(paper.title)
+
+	版本号高于本程序支持的快照会被拒绝（ValueError）；字节序不同的机器上导出的快照
+	在读取数组时转换。
+	"""
+
+	def __init__(self, path):
+		self.path = path
+		self._file = open(path, "rb")
+		try:
+			self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+		except ValueError:
+			self._file.close()
+			raise ValueError(f"Empty snapshot file: {path}")
+		self._view = memoryview(self._map)
+		self._columns = {}
+		try:
+			self._open()
+		except BaseException:
+			self.close()
+			raise
+
+	def _open(self):
+		if len(self._map) < _HEADER.size:
+			raise ValueError(f"Truncated snapshot: {self.path}")
+		magic, version, _, offset, length = _HEADER.unpack_from(self._map, 0)
+		if magic != MAGIC:
+			raise ValueError(f"Not a Paper-Tunneling snapshot: {self.path}")
+		if version > VERSION:
+			raise ValueError(f"Snapshot {self.path} has format version {version}; this version reads up to {VERSION}")
+		if offset + length > len(self._map):
+			raise ValueError(f"Truncated snapshot: {self.path}")
+		self.version = version
+		self.meta = json.loads(bytes(self._view[offset:offset + length]).decode("utf-8"))
+		if self.meta.get("codec", "zlib") != "zlib":
+			raise ValueError(f"Unsupported snapshot codec {self.meta['codec']!r}: {self.path}")
+		self.source = self.meta["source"]
+		self.year = self.meta["year"]
+		self.created = self.meta.get("created")
+		self.keywords = self.meta.get("keywords")
+		self.block_rows = self.meta.get("block_rows", BLOCK_ROWS)
+		self._check_columns()
+		self.author_offsets = self._array("author_offsets", "Q")
+		self.author_ids = self._array("author_ids", "I")
+
+	def _check_columns(self):
+		"""行数与各文本列的偏移数、块数必须一致，否则读取时会越界或静默丢行"""
+		rows = self.meta["rows"]
+		blocks = max(1, -(-rows // self.block_rows))
+		if self._section("author_offsets")[1] != 8 * (rows + 1):
+			raise ValueError(f"Corrupt snapshot (author offsets do not match {rows} rows): {self.path}")
+		for name in TEXT_COLUMNS:
+			if self._section(f"{name}.offsets")[1] != 8 * (rows + 1):
+				raise ValueError(f"Corrupt snapshot ({name} offsets do not match {rows} rows): {self.path}")
+			if self._section(f"{name}.blocks")[1] != 8 * (blocks + 1):
+				raise ValueError(f"Corrupt snapshot ({name} has the wrong number of blocks): {self.path}")
+
+	def _section(self, name):
+		start, length = self.meta["sections"][name]
+		if start + length > len(self._map):
+			raise ValueError(f"Truncated snapshot section {name!r}: {self.path}")
+		return start, length
+
+	def _array(self, name, typecode):
+		start, length = self._section(name)
+		view = self._view[start:start + length]
+		if self.meta.get("byteorder", sys.byteorder) == sys.byteorder:
+			return view.cast(typecode)
+		# 其他字节序的机器导出的快照：复制一份并转换
+		values = array(typecode)
+		values.frombytes(view)
+		values.byteswap()
+		view.release()
+		return values
+
+	def column(self, name):
+		column = self._columns.get(name)
+		if column is None:
+			column = self._columns[name] = _MappedText(self, name)
+		return column
+
+	def __len__(self):
+		return self.meta["rows"]
+
+	def authors(self, row):
+		names = self.column("names")
+		return [names[i] for i in self.author_ids[self.author_offsets[row]:self.author_offsets[row + 1]]]
+
+	def __getitem__(self, row):
+		if row < 0:
+			row += len(self)
+		return Paper(
+			self.source, self.year, self.column("titles")[row], self.authors(row),
+			self.column("abstracts")[row], self.column("urls")[row], pdf_url=self.column("pdf_urls")[row],
+		)
+
+	def __iter__(self):
+		for row in range(len(self)):
+			yield self[row]
+
+	def rows(self):
+		"""顺序返回 (标题, 作者列表, 摘要, URL, PDF 链接)，文本列每块只解压一次"""
+		texts = zip(*(self.column(name) for name in TEXT_COLUMNS))
+		for row, (title, abstract, url, pdf_url) in enumerate(texts):
+			yield title, self.authors(row), abstract, url, pdf_url
+
+	def matches(self, keywords):
+		"""标题或摘要命中任意关键词的论文（与爬虫的匹配规则相同）；未命中的行不创建 Paper"""
+		patterns = [re.compile(re.escape(k), re.IGNORECASE) for k in keywords]
+		texts = zip(self.column("titles"), self.column("abstracts"))
+		for row, (title, abstract) in enumerate(texts):
+			if any(p.search(title) or p.search(abstract) for p in patterns):
+				yield self[row]
+
+	def close(self):
+		for column in self._columns.values():
+			column.release()
+		self._columns = {}
+		for name in ("author_offsets", "author_ids"):
+			_release(getattr(self, name, None))
+			setattr(self, name, None)
+		if self._view is not None:
+			self._view.release()
+			self._view = None
+			self._map.close()
+		self._file.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
@@ -0,0 +1,209 @@
+import codecs
+import re
+import time
+
+from yarl import URL
+
+
+_CONTENT_RANGE = re.compile(r"bytes\s+(\d+)-(\d+)/(\d+|\*)")
+
+
+class StreamStats:
+	"""流式抓取统计：读取字节、提前终止节省的字节与估算节省的时延。
+
+	节省量按线上（压缩后）字节计：压缩响应只有在能取得已接收的压缩字节数时才计入，
+	否则记为未知（unmeasured），不当作没有节省。
+	"""
+
+	def __init__(self):
+		self.stats = {
+			"pages": 0,
+			"early_stops": 0,
+			"range_requests": 0,
+			"bytes_read": 0,
+			"bytes_skipped": 0,
+			# 能确定线上字节数的页面：读取的线上字节与读取响应体的耗时
+			"measured_pages": 0,
+			"wire_bytes": 0,
+			"read_seconds": 0.0,
+			"unmeasured": 0,
+		}
+
+	@property
+	def seconds_saved(self):
+		# 按响应体的实际读取速度外推：跳过的字节若继续读取需要的时间（不含排队、退避与首字节时间）
+		s = self.stats
+		if not s["wire_bytes"]:
+			return 0.0
+		return s["read_seconds"] * s["bytes_skipped"] / s["wire_bytes"]
+
+	def summary(self):
+		s = self.stats
+		pages = s["measured_pages"] or 1
+		text = (
+			f"{s['pages']} pages streamed, {s['early_stops']} stopped early, {s['range_requests']} range requests; "
+			f"read {s['bytes_read'] / 1024:.0f} KiB, skipped {s['bytes_skipped'] / 1024:.0f} KiB "
+			f"({s['bytes_skipped'] / pages / 1024:.1f} KiB/page, ~{self.seconds_saved / pages * 1000:.0f} ms/page saved)"
+		)
+		if s["unmeasured"]:
+			text += f"; savings unknown for {s['unmeasured']} compressed pages"
+		return text
+
+
+class _StreamState:
+	"""跨多个 Range 分段的增量解码状态，支持分段重试时回滚"""
+
+	def __init__(self):
+		self.decoder = None
+		self.parts = []
+		self.received = 0
+		self.total = None
+		# 已接收的线上字节（压缩响应取不到时为 None）与读取响应体的耗时
+		self.wire = 0
+		self.seconds = 0.0
+		self.encoded = False
+		self.more = False
+		self.done = False
+		self._snapshot = (0, 0, None, 0, 0.0)
+
+	def begin_segment(self):
+		state = self.decoder.getstate() if self.decoder else None
+		self._snapshot = (self.received, len(self.parts), state, self.wire, self.seconds)
+
+	def rollback(self):
+		received, count, state, wire, seconds = self._snapshot
+		self.received = received
+		self.wire = wire
+		self.seconds = seconds
+		del self.parts[count:]
+		if state is None:
+			self.decoder = None
+		else:
+			self.decoder.setstate(state)
+		self.done = False
+
+	def reset(self):
+		self.decoder = None
+		self.parts = []
+		self.received = 0
+		self.total = None
+		self.wire = 0
+		self.seconds = 0.0
+		self.done = False
+		self._snapshot = (0, 0, None, 0, 0.0)
+
+	def feed(self, chunk, charset):
+		if self.decoder is None:
+			try:
+				self.decoder = codecs.getincrementaldecoder(charset or "utf-8")(errors="replace")
+			except LookupError:
+				self.decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+		self.received += len(chunk)
+		self.parts.append(self.decoder.decode(chunk))
+
+	def text(self):
+		if len(self.parts) > 1:
+			self.parts = ["".join(self.parts)]
+		return self.parts[0] if self.parts else ""
+
+
+class PartialFetcher:
+	"""边下载边解码，is_complete(text) 为真时立即停止读取。
+
+	对声明了 Accept-Ranges: bytes 的 host，后续请求按 range_bytes 分段请求，
+	字段到齐后不再请求剩余分段，连接也能正常归还连接池。
+	"""
+
+	def __init__(self, config):
+		options = config.get("streaming") or {}
+		self.enabled = options.get("enabled", True)
+		self.chunk_size = options.get("chunk_size", 16384)
+		self.range_bytes = options.get("range_bytes", 65536)
+		self.use_range = options.get("use_range", True)
+		self.range_support = {}
+		self.stream_stats = StreamStats()
+
+	async def fetch(self, session, url, is_complete, retry_policy):
+		host = URL(url).host
+		state = _StreamState()
+		while True:
+			headers = None
+			if self.use_range and self.range_support.get(host):
+				start = state.received
+				# 分段请求时要求 identity 编码，字节偏移才与解码后内容一致
+				headers = {"Range": f"bytes={start}-{start + self.range_bytes - 1}", "Accept-Encoding": "identity"}
+				self.stream_stats.stats["range_requests"] += 1
+			state.begin_segment()
+
+			async def _read(resp):
+				return await self._read_segment(resp, state, is_complete, host, headers is not None, retry_policy.budget)
+
+			ok = await retry_policy.request(session, url, _read, headers=headers)
+			if not ok:
+				return None
+			if state.done or not state.more:
+				break
+
+		s = self.stream_stats.stats
+		s["pages"] += 1
+		s["bytes_read"] += state.received
+		if state.done:
+			s["early_stops"] += 1
+		if state.wire is None:
+			if state.done:
+				s["unmeasured"] += 1
+		else:
+			s["measured_pages"] += 1
+			s["wire_bytes"] += state.wire
+			s["read_seconds"] += state.seconds
+			if state.done and state.total is not None:
+				s["bytes_skipped"] += max(0, state.total - state.wire)
+		return state.text()
+
+	async def _read_segment(self, resp, state, is_complete, host, ranged, budget=None):
+		state.rollback()
+		if resp.status == 200:
+			# 首次请求或服务器忽略了 Range：从头读取完整响应
+			state.reset()
+			state.encoded = bool(resp.headers.get("Content-Encoding"))
+			if ranged:
+				self.range_support[host] = False
+			else:
+				self.range_support.setdefault(host, resp.headers.get("Accept-Ranges", "").lower() == "bytes")
+			length = resp.headers.get("Content-Length")
+			# 压缩响应的 Content-Length 是压缩后的长度，与线上字节比较
+			state.total = int(length) if length and length.isdigit() else None
+			state.more = False
+		elif resp.status == 206:
+			match = _CONTENT_RANGE.match(resp.headers.get("Content-Range", ""))
+			if not match:
+				self.range_support[host] = False
+				return None
+			end, total = int(match.group(2)), match.group(3)
+			state.total = int(total) if total != "*" else None
+			state.more = state.total is None or end + 1 < state.total
+			state.encoded = False
+		else:
+			return None
+
+		segment_start = state.received
+		started = time.perf_counter()
+		async for chunk in resp.content.iter_chunked(self.chunk_size):
+			state.feed(chunk, resp.charset)
+			if is_complete(state.text()):
+				state.done = True
+				break
+		state.seconds += time.perf_counter() - started
+		if not state.encoded:
+			if state.wire is not None:
+				state.wire += state.received - segment_start
+		else:
+			# 自动解压后读到的是解压后的字节；较新的 aiohttp 记录了已接收的压缩字节数
+			raw = getattr(resp.content, "total_raw_bytes", None)
+			state.wire = raw if isinstance(raw, int) else None
+		# 流式读取不经过 TraceConfig 的响应数据回调，在此按实际读取的字节记入预算
+		if budget is not None:
+			budget.charge_bytes(state.received - segment_start)
+		if state.received == segment_start or state.received == state.total:
+			state.more = False
+		return True
@@ -0,0 +1,83 @@
+import aiohttp
+
+
+def accept_encoding():
+	"""aiohttp 只有在安装了 brotli/brotlicffi 时才能解压 br，因此按需声明"""
+	try:
+		import brotli  # noqa: F401
+	except ImportError:
+		try:
+			import brotlicffi  # noqa: F401
+		except ImportError:
+			return "gzip, deflate"
+	return "gzip, deflate, br"
+
+
+class ConnectionStats:
+	"""通过 aiohttp TraceConfig 统计连接复用情况，验证 TCP/TLS 握手是否被摊薄"""
+
+	def __init__(self):
+		self.stats = {
+			"requests": 0,
+			"new_connections": 0,
+			"reused_connections": 0,
+			"dns_cache_hits": 0,
+			"dns_cache_misses": 0,
+		}
+
+	def trace_config(self):
+		trace = aiohttp.TraceConfig()
+		trace.on_request_start.append(self._counter("requests"))
+		trace.on_connection_create_end.append(self._counter("new_connections"))
+		trace.on_connection_reuseconn.append(self._counter("reused_connections"))
+		trace.on_dns_cache_hit.append(self._counter("dns_cache_hits"))
+		trace.on_dns_cache_miss.append(self._counter("dns_cache_misses"))
+		return trace
+
+	def _counter(self, key):
+		async def _on_event(session, context, params):
+			self.stats[key] += 1
+		return _on_event
+
+	@property
+	def reuse_ratio(self):
+		total = self.stats["new_connections"] + self.stats["reused_connections"]
+		return self.stats["reused_connections"] / total if total else 0.0
+
+	def summary(self):
+		s = self.stats
+		return (
+			f"{s['requests']} requests over {s['new_connections']} new connections "
+			f"({s['reused_connections']} reused, {self.reuse_ratio:.0%} reuse), "
+			f"DNS cache {s['dns_cache_hits']} hits / {s['dns_cache_misses']} misses"
+		)
+
+
+def build_session(config, connection_stats=None, budget=None):
+	"""按配置创建共享 ClientSession：连接池、keep-alive、DNS 缓存、压缩与统一超时"""
+	options = config.get("transport") or {}
+	concurrency = config.get("concurrency", 20)
+	connector = aiohttp.TCPConnector(
+		limit=options.get("limit", 100),
+		# 单 host 连接数与爬虫并发数一致，避免排队的请求另开新连接
+		limit_per_host=options.get("limit_per_host", concurrency),
+		use_dns_cache=True,
+		ttl_dns_cache=options.get("dns_ttl", 300),
+		keepalive_timeout=options.get("keepalive_timeout", 30),
+	)
+	timeout = aiohttp.ClientTimeout(
+		total=config.get("timeout", 30),
+		connect=options.get("connect_timeout", 10),
+		sock_read=options.get("read_timeout", 20),
+	)
+	trace_configs = []
+	if connection_stats:
+		trace_configs.append(connection_stats.trace_config())
+	if budget is not None and budget.enabled:
+		trace_configs.append(budget.trace_config())
+	return aiohttp.ClientSession(
+		connector=connector,
+		timeout=timeout,
+		headers={"Accept-Encoding": accept_encoding()},
+		trace_configs=trace_configs or None,
+	)
@@ -0,0 +1,489 @@
+import asyncio
+import collections
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .budget import BudgetExceeded, current_source
+from .events import ERROR, LOG
+from .frontier import DETAIL
+from .profiling import label_task, task_label
+from .records import PaperStore
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+	name TEXT PRIMARY KEY,
+	value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+	seq INTEGER PRIMARY KEY AUTOINCREMENT,
+	key TEXT NOT NULL UNIQUE,
+	source TEXT NOT NULL,
+	method TEXT NOT NULL,
+	args TEXT NOT NULL,
+	kind INTEGER NOT NULL,
+	priority INTEGER NOT NULL DEFAULT 0,
+	state TEXT NOT NULL DEFAULT 'pending',
+	owner TEXT,
+	lease_until REAL,
+	attempts INTEGER NOT NULL DEFAULT 0,
+	error TEXT
+);
+CREATE INDEX IF NOT EXISTS tasks_ready ON tasks (state, kind, priority, seq);
+CREATE TABLE IF NOT EXISTS papers (
+	id INTEGER PRIMARY KEY AUTOINCREMENT,
+	worker TEXT NOT NULL,
+	source TEXT NOT NULL,
+	year INTEGER,
+	title TEXT NOT NULL,
+	authors TEXT NOT NULL,
+	abstract TEXT NOT NULL,
+	url TEXT NOT NULL,
+	matched INTEGER NOT NULL,
+	pdf_url TEXT
+);
+CREATE TABLE IF NOT EXISTS shards (
+	worker TEXT PRIMARY KEY,
+	stats TEXT NOT NULL,
+	updated REAL NOT NULL
+);
+"""
+
+# 任务参数中的共享对象（前沿队列、HTTP 会话）不能序列化，用占位符代替，执行时由本进程替换
+_FRONTIER = {"$ref": "frontier"}
+_SESSION = {"$ref": "session"}
+
+# 协调者写入运行配置时需要保持一致的字段：同一个队列文件只能服务于同一次抓取
+_RUN_FIELDS = ("keywords", "years", "conferences", "journals")
+
+
+def worker_name():
+	return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class WorkQueue:
+	"""基于 SQLite 的共享任务队列，可被同一台或多台机器上的多个进程同时消费。
+
+	任务以 key 全局去重；worker 通过租约 (lease) 领取任务，执行完成后确认 (ack)，
+	确认与该批次产出的论文在同一事务中写入。进程崩溃时租约到期，任务自动回到待领取
+	状态由其他 worker 重做，因此论文可能被重复写入，合并时按来源 + URL + 标题去重。
+
+	多机使用时，数据库文件所在的文件系统必须支持可靠的文件锁（本地磁盘或支持锁的共享存储）。
+
+	方法本身是同步的；抓取期间经 submit 在队列专用的单个线程中执行，其他进程持有写锁时
+	（BEGIN IMMEDIATE 最长等待 30 秒）阻塞的是该线程而不是事件循环。
+	"""
+
+	def __init__(self, path, lease_seconds=120, max_attempts=3):
+		self.path = path
+		self.lease_seconds = lease_seconds
+		self.max_attempts = max_attempts
+		folder = os.path.dirname(os.path.abspath(path))
+		os.makedirs(folder, exist_ok=True)
+		# 连接在启动/合并时由主线程使用，抓取期间只由 submit 的单个线程使用，不会并发访问
+		self._db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+		self._io = None
+		self._db.execute("PRAGMA journal_mode=WAL")
+		self._db.execute("PRAGMA synchronous=NORMAL")
+		self._db.executescript(_SCHEMA)
+
+	@classmethod
+	def from_config(cls, config):
+		settings = config.get("queue", {}) or {}
+		return cls(
+			config["queue_path"],
+			lease_seconds=settings.get("lease_seconds", 120),
+			max_attempts=settings.get("max_attempts", 3),
+		)
+
+	def close(self):
+		if self._io is not None:
+			self._io.shutdown()
+			self._io = None
+		self._db.close()
+
+	async def submit(self, method, *args):
+		"""在队列专用线程中执行 method(*args)，所有调用按提交顺序串行"""
+		if self._io is None:
+			self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="workqueue")
+		return await asyncio.get_running_loop().run_in_executor(self._io, method, *args)
+
+	# ---- 运行配置 ----
+
+	def get_meta(self, name, default=None):
+		row = self._db.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+		return json.loads(row[0]) if row else default
+
+	def set_meta(self, name, value):
+		self._db.execute(
+			"INSERT INTO meta (name, value) VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = excluded.value",
+			(name, json.dumps(value, ensure_ascii=False, default=str)),
+		)
+
+	def publish_config(self, config):
+		"""协调者保存运行配置；队列中已有另一组关键词/年份/来源的抓取时拒绝复用"""
+		existing = self.get_meta("config")
+		if existing is not None:
+			for field in _RUN_FIELDS:
+				if existing.get(field) != json.loads(json.dumps(config.get(field), default=str)):
+					raise ValueError(
+						f"Queue {self.path} belongs to another crawl ({field} differs); use a new queue file"
+					)
+		self.set_meta("config", config)
+
+	def wait_for_config(self, poll_interval=1.0):
+		"""worker 启动时等待协调者写入运行配置"""
+		while True:
+			config = self.get_meta("config")
+			if config is not None:
+				return config
+			time.sleep(poll_interval)
+
+	# ---- 任务 ----
+
+	def put(self, key, source, method, args, kind=DETAIL, priority=0):
+		cursor = self._db.execute(
+			"INSERT OR IGNORE INTO tasks (key, source, method, args, kind, priority) VALUES (?, ?, ?, ?, ?, ?)",
+			(key, source, method, args, kind, priority),
+		)
+		return cursor.rowcount > 0
+
+	def seen(self, key):
+		return self._db.execute("SELECT 1 FROM tasks WHERE key = ?", (key,)).fetchone() is not None
+
+	def lease(self, worker, limit):
+		"""领取最多 limit 个任务：列表页优先，其次按优先级与入队顺序；过期租约先回收"""
+		now = time.time()
+		with self._transaction():
+			self._db.execute(
+				"UPDATE tasks SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+				"owner = NULL, error = COALESCE(error, 'lease expired') "
+				"WHERE state = 'leased' AND lease_until < ?",
+				(self.max_attempts, now),
+			)
+			rows = self._db.execute(
+				"SELECT seq, key, source, method, args FROM tasks WHERE state = 'pending' "
+				"ORDER BY kind, priority, seq LIMIT ?",
+				(limit,),
+			).fetchall()
+			if rows:
+				self._db.executemany(
+					"UPDATE tasks SET state = 'leased', owner = ?, lease_until = ?, attempts = attempts + 1 WHERE seq = ?",
+					[(worker, now + self.lease_seconds, row[0]) for row in rows],
+				)
+		return [(key, source, method, args) for _, key, source, method, args in rows]
+
+	def extend(self, worker, keys):
+		"""续租：长时间运行（退避重试、串行回填）的任务不会被当作崩溃"""
+		until = time.time() + self.lease_seconds
+		with self._transaction():
+			self._db.executemany(
+				"UPDATE tasks SET lease_until = ? WHERE key = ? AND owner = ? AND state = 'leased'",
+				[(until, key, worker) for key in keys],
+			)
+
+	def commit(self, worker, done, failed, papers, stats):
+		"""在一个事务中写入论文、确认已完成的任务、退回失败的任务并更新分片统计。
+
+		failed 为 (key, error) 列表：未达到最大尝试次数时回到待领取状态。
+		"""
+		with self._transaction():
+			if papers:
+				self._db.executemany(
+					"INSERT INTO papers (worker, source, year, title, authors, abstract, url, matched, pdf_url) "
+					"VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+					[
+						(
+							worker, source, year, title, json.dumps(authors, ensure_ascii=False),
+							abstract, url, int(matched), pdf_url,
+						)
+						for source, year, title, authors, abstract, url, matched, pdf_url in papers
+					],
+				)
+			self._db.executemany(
+				"UPDATE tasks SET state = 'done', lease_until = NULL WHERE key = ? AND owner = ? AND state = 'leased'",
+				[(key, worker) for key in done],
+			)
+			self._db.executemany(
+				"UPDATE tasks SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+				"owner = NULL, lease_until = NULL, error = ? WHERE key = ? AND owner = ? AND state = 'leased'",
+				[(self.max_attempts, error, key, worker) for key, error in failed],
+			)
+			if stats is not None:
+				self._db.execute(
+					"INSERT INTO shards (worker, stats, updated) VALUES (?, ?, ?) "
+					"ON CONFLICT(worker) DO UPDATE SET stats = excluded.stats, updated = excluded.updated",
+					(worker, json.dumps(stats), time.time()),
+				)
+
+	def unfinished(self):
+		"""所有进程尚未完成的任务（待领取或租约中），(key, source, method, args) 列表"""
+		return self._db.execute(
+			"SELECT key, source, method, args FROM tasks WHERE state IN ('pending', 'leased') ORDER BY seq"
+		).fetchall()
+
+	def outstanding(self):
+		"""所有未完成的任务（待领取、租约中或已放弃），(source, method, args, state) 列表"""
+		return self._db.execute(
+			"SELECT source, method, args, state FROM tasks WHERE state != 'done' ORDER BY seq"
+		).fetchall()
+
+	def counts(self):
+		rows = self._db.execute("SELECT state, COUNT(*) FROM tasks GROUP BY state").fetchall()
+		counts = {"pending": 0, "leased": 0, "done": 0, "failed": 0}
+		counts.update(dict(rows))
+		return counts
+
+	def drained(self):
+		"""种子已全部入队，且没有待领取或租约中的任务"""
+		if not self.get_meta("seeded", False):
+			return False
+		counts = self.counts()
+		return counts["pending"] == 0 and counts["leased"] == 0
+
+	# ---- 合并 ----
+
+	def load_store(self):
+		"""读取所有分片写入的论文，按来源 + URL + 标题去重后放入新的 PaperStore"""
+		store = PaperStore()
+		seen = set()
+		rows = self._db.execute(
+			"SELECT source, year, title, authors, abstract, url, matched, pdf_url FROM papers ORDER BY id"
+		)
+		for source, year, title, authors, abstract, url, matched, pdf_url in rows:
+			key = (source, url, title)
+			if key in seen:
+				continue
+			seen.add(key)
+			store.append(source, year, title, json.loads(authors), abstract, url, bool(matched), pdf_url)
+		return store
+
+	def shard_stats(self):
+		return {
+			worker: json.loads(stats)
+			for worker, stats in self._db.execute("SELECT worker, stats FROM shards ORDER BY worker")
+		}
+
+	def _transaction(self):
+		return _Transaction(self._db)
+
+
+class _Transaction:
+	"""BEGIN IMMEDIATE 事务：领取/确认在多个进程间互斥"""
+
+	def __init__(self, db):
+		self._db = db
+
+	def __enter__(self):
+		self._db.execute("BEGIN IMMEDIATE")
+		return self._db
+
+	def __exit__(self, exc_type, exc, tb):
+		self._db.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+class ShardedFrontier:
+	"""与 Frontier 接口一致、但任务存放在共享 WorkQueue 中的前沿队列。
+
+	入队时把 handler 记录为 (来源名, 方法名)，参数序列化为 JSON；本进程的 worker
+	批量领取任务、在同名爬虫上执行，并定期把新增论文与确认一起提交。所有进程都看不到
+	待办或租约中的任务时才结束，因此协调者的 run 返回即代表整个抓取完成。
+	"""
+
+	def __init__(self, queue, scrapers, session, store, workers=20, events=None,
+			flush_interval=5.0, poll_interval=1.0, shard_stats=None, budget=None):
+		self.queue = queue
+		self.scrapers = {scraper.conference_name: scraper for scraper in scrapers}
+		self.session = session
+		self.store = store
+		self.workers = max(1, workers)
+		self.events = events
+		self.flush_interval = flush_interval
+		self.poll_interval = poll_interval
+		self.shard_stats = shard_stats
+		self.budget = budget
+		self.worker_id = worker_name()
+		self.stats = {"enqueued": 0, "duplicates": 0, "failed": 0, "leased": 0, "skipped": 0}
+		self._buffer = collections.deque()
+		self._lease_lock = asyncio.Lock()
+		# 正在执行的任务 key -> (handler, args)，参数解码前为 None
+		self._running = {}
+		# 本进程入队过的 key：seen 只查本地，跨进程的重复由 put 的 INSERT OR IGNORE 去掉
+		self._known = set()
+		self._done = []
+		self._failed = []
+		self._flushed_rows = len(store)
+		self._last_flush = time.monotonic()
+		self._finished = False
+
+	def seen(self, key):
+		return key in self._known
+
+	async def put(self, handler, *args, key=None, kind=DETAIL, priority=0):
+		"""把 handler(*args) 写入共享队列；key 已出现过（任何进程）时返回 False"""
+		scraper = handler.__self__
+		payload = json.dumps([self._encode(arg) for arg in args], ensure_ascii=False)
+		if key is None:
+			key = hashlib.sha1(f"{scraper.conference_name}\n{handler.__name__}\n{payload}".encode("utf-8")).hexdigest()
+		self._known.add(key)
+		if await self.queue.submit(self.queue.put, key, scraper.conference_name, handler.__name__, payload, kind, priority):
+			self.stats["enqueued"] += 1
+			return True
+		self.stats["duplicates"] += 1
+		return False
+
+	async def mark_seeded(self):
+		await self.queue.submit(self.queue.set_meta, "seeded", True)
+
+	def _encode(self, arg):
+		if arg is self:
+			return _FRONTIER
+		if arg is self.session:
+			return _SESSION
+		return arg
+
+	def _decode(self, arg):
+		if arg == _FRONTIER:
+			return self
+		if arg == _SESSION:
+			return self.session
+		return arg
+
+	async def _next(self):
+		while True:
+			if self._buffer:
+				return self._buffer.popleft()
+			if self._finished:
+				return None
+			async with self._lease_lock:
+				if self._buffer or self._finished:
+					continue
+				leased = await self.queue.submit(self.queue.lease, self.worker_id, self.workers)
+				if leased:
+					self.stats["leased"] += len(leased)
+					self._buffer.extend(leased)
+					continue
+				if not self._running:
+					# 本进程空闲：先提交确认，再判断全局是否已经没有任务
+					await self.flush()
+					if await self.queue.submit(self.queue.drained):
+						self._finished = True
+						return None
+			await asyncio.sleep(self.poll_interval)
+
+	async def _worker(self):
+		while True:
+			item = await self._next()
+			if item is None:
+				return
+			key, source, method, payload = item
+			self._running[key] = None
+			current_source.set(source)
+			scraper = None
+			try:
+				try:
+					handler, args = self._resolve(source, method, payload)
+					scraper = handler.__self__
+					self._running[key] = (handler, args)
+					label_task(f"{type(scraper).__name__}.{method}")
+					if self.budget is not None:
+						self.budget.check()
+					await handler(*args)
+				except BudgetExceeded as e:
+					# 本进程的预算用完：退回任务（其他进程仍可领取）并停止领取新任务
+					self.stats["skipped"] += 1
+					self._failed.append((key, f"Skipped: {e}"))
+					if self.budget is not None and scraper is not None:
+						self.budget.mark_incomplete(handler, args, e.reason)
+					if e.source is None:
+						del self._running[key]
+						return
+				except Exception as e:
+					self.stats["failed"] += 1
+					message = f"Task {method} failed: {e!r}"
+					self._failed.append((key, message))
+					if self.events is not None:
+						self.events.emit(ERROR, message)
+					else:
+						print(message)
+				else:
+					self._done.append(key)
+				# 被取消的任务保留在 _running 中，供 pending() 报告
+				del self._running[key]
+			finally:
+				task_label.set(None)
+			if time.monotonic() - self._last_flush >= self.flush_interval:
+				await self.flush()
+
+	def _resolve(self, source, method, payload):
+		scraper = self.scrapers.get(source)
+		if scraper is None:
+			raise LookupError(f"Unknown source {source!r} in queue")
+		return getattr(scraper, method), [self._decode(arg) for arg in json.loads(payload)]
+
+	def pending(self):
+		"""尚未完成的任务 (handler, args)：本进程正在执行的、已领取还在缓冲中的，以及共享队列中
+		其他进程还没做完的（协调者在截止时间合并时，这些来源-年份同样不完整）"""
+		items = [item for item in self._running.values() if item is not None]
+		seen = set(self._running)
+		for key, source, method, payload in list(self._buffer) + self.queue.unfinished():
+			if key in seen:
+				continue
+			seen.add(key)
+			try:
+				items.append(self._resolve(source, method, payload))
+			except LookupError:
+				continue
+		return items
+
+	async def flush(self):
+		"""提交新增论文、已完成/失败的任务与本分片统计"""
+		rows = range(self._flushed_rows, len(self.store))
+		papers = []
+		for row in rows:
+			paper = self.store[row]
+			papers.append((
+				paper.source, paper.year, paper.title, list(paper.authors),
+				paper.abstract, paper.url, bool(self.store.matched[row]), paper.pdf_url,
+			))
+		stats = self.shard_stats() if self.shard_stats is not None else None
+		done, failed = self._done, self._failed
+		# 提交期间完成的任务进入新的列表，下一次再提交
+		self._flushed_rows = len(self.store)
+		self._done = []
+		self._failed = []
+		self._last_flush = time.monotonic()
+		try:
+			await self.queue.submit(self.queue.commit, self.worker_id, done, failed, papers, stats)
+		except BaseException:
+			self._flushed_rows = rows.start
+			self._done = done + self._done
+			self._failed = failed + self._failed
+			raise
+
+	async def _heartbeat(self):
+		while True:
+			await asyncio.sleep(self.queue.lease_seconds / 3)
+			keys = list(self._running) + list(self._done) + [item[0] for item in self._buffer]
+			if keys:
+				await self.queue.submit(self.queue.extend, self.worker_id, keys)
+
+	async def run(self):
+		"""执行共享队列中的任务，直到所有进程都没有剩余任务"""
+		if self.events is not None:
+			self.events.emit(LOG, f"[Queue] Worker {self.worker_id} consuming {self.queue.path}")
+		heartbeat = asyncio.create_task(self._heartbeat())
+		workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+		try:
+			await asyncio.gather(*workers)
+		finally:
+			for task in workers:
+				task.cancel()
+			heartbeat.cancel()
+			await asyncio.gather(heartbeat, *workers, return_exceptions=True)
+			await self.flush()
@@ -1,15 +1,19 @@
-import asyncio
 import xml.etree.ElementTree as ET
 from datetime import datetime
-from tqdm import tqdm
 from .base import BaseScraper
+from ..core.events import FOUND, LOG
+from ..core.frontier import LIST
 
 
 class ArxivScraper(BaseScraper):
+    # The API query includes the keywords, so a snapshot only holds papers for those keywords
+    keyword_query = True
+
     def __init__(self, config):
         super().__init__(config)
         self.conference_name = "arXiv"
         self.base_url = "http://export.arxiv.org/api/query"
+        self.batch_size = 200  # Fetch up to 200 at a time
         # We need a fallback structure for stats based on the years queried
         self.stats = {year: {"scanned": 0, "found": 0} for year in self.config.get("years", [])}
 
@@ -45,7 +49,8 @@ class ArxivScraper(BaseScraper):
         xml_data = await self.fetch(session, url)
         
         if not xml_data:
-            return [], 0
+            self.record_failure(year)
+            return 0
 
         # Parse XML
         root = ET.fromstring(xml_data)
@@ -59,80 +64,56 @@ class ArxivScraper(BaseScraper):
         
         entries = root.findall('atom:entry', ns)
         
-        parsed_papers = []
         for entry in entries:
             self.stats[year]["scanned"] += 1
-            
+
             # Extract basic info
             title = entry.find('atom:title', ns).text.replace('\n', ' ').strip()
             abstract = entry.find('atom:summary', ns).text.replace('\n', ' ').strip()
-            
+            url = entry.find('atom:id', ns).text
+            authors = [author.find('atom:name', ns).text for author in entry.findall('atom:author', ns)]
+            pdf_link = entry.find("atom:link[@title='pdf']", ns)
+            pdf_url = pdf_link.get('href') if pdf_link is not None else url.replace('/abs/', '/pdf/', 1)
+
             # Use local filtering to ensure exact keyword match as other scrapers
-            if self.is_match(title, abstract):
+            matched = self.is_match(title, abstract)
+            self.add_paper(year, title, authors, abstract, url, matched, pdf_url)
+            if matched:
                 self.stats[year]["found"] += 1
-                
-                # Extract URL
-                url = entry.find('atom:id', ns).text
-                
-                # Extract authors
-                authors = []
-                for author in entry.findall('atom:author', ns):
-                    name = author.find('atom:name', ns).text
-                    authors.append(name)
-                authors_str = ", ".join(authors)
-                
-                parsed_papers.append({
-                    "source": "arXiv",
-                    "year": year,
-                    "title": title,
-                    "authors": authors_str,
-                    "abstract": abstract,
-                    "url": url,
-                })
-                
-        return parsed_papers, total_results
-
-    async def process_year(self, session, year):
-        print(f"Scanning arXiv {year}...")
-        
-        all_year_papers = []
-        start = 0
-        max_results = 200 # Fetch up to 200 at a time
-        
+                self.emit(FOUND, year=year, title=title, url=url)
+
+        return total_results
+
+    async def seed(self, frontier, session):
+        for year in self.crawl_years():
+            url = self._build_query_url(year, self.batch_size, 0)
+            await frontier.put(self.process_first_batch, frontier, session, year, key=url, kind=LIST)
+
+    async def process_first_batch(self, frontier, session, year):
+        self.emit(LOG, f"Scanning arXiv {year}...", year=year)
+
         # Fetch the first batch to get total_results
-        first_batch_papers, total_results = await self._fetch_and_parse_batch(session, year, start, max_results)
-        all_year_papers.extend(first_batch_papers)
-        
+        total_results = await self._fetch_and_parse_batch(session, year, 0, self.batch_size)
+
         # We know total_results after the first fetch, so we can mock the ICML output format:
         # ICML prints: "[ICML 2024] Found X papers. Fetching details..."
-        # Then uses tqdm for fetching
         # arXiv already fetched the first batch, so we report based on total_results.
-        print(f"[arXiv {year}] Found {total_results} prospective papers. Fetching details...")
-        
-        # We want to show a progress bar for the actual processing.
-        # arXiv fetches batches of up to 200. We can simulate the progress bar over the total batches.
+        self.emit(LOG, f"[arXiv {year}] Found {total_results} prospective papers. Fetching details...", year=year)
+
+        # The remaining batches are index pages too: enqueue them with list priority so the
+        # shared workers fetch them concurrently with other sources and years.
+        starts = list(range(self.batch_size, total_results, self.batch_size))
         if total_results > 0:
-            remaining_batches = []
-            if total_results > max_results:
-                for s in range(max_results, total_results, max_results):
-                    remaining_batches.append(self._fetch_and_parse_batch(session, year, s, max_results))
-            
-            if remaining_batches:
-                for coro in tqdm(asyncio.as_completed(remaining_batches), total=len(remaining_batches), desc=f"arXiv {year}"):
-                    batch_papers, _ = await coro
-                    all_year_papers.extend(batch_papers)
-            else:
+            self._add_progress(year, max(1, len(starts)))
+            if not starts:
                 # Mock a 100% progress bar if it all fit in the first batch
-                for _ in tqdm(range(1), desc=f"arXiv {year}"):
-                    pass
-        
-        return all_year_papers
+                self._advance_progress(year)
+        for start in starts:
+            url = self._build_query_url(year, self.batch_size, start)
+            await frontier.put(self.process_batch, session, year, start, key=url, kind=LIST)
 
-    async def run(self, session):
-        all_results = []
-        
-        for year in self.config.get("years", []):
-            year_results = await self.process_year(session, year)
-            all_results.extend(year_results)
-            
-        return all_results, self.stats
+    async def process_batch(self, session, year, start):
+        try:
+            await self._fetch_and_parse_batch(session, year, start, self.batch_size)
+        finally:
+            self._advance_progress(year)
@@ -1,26 +1,101 @@
 import asyncio
 import re
+from bs4 import BeautifulSoup
+from ..core.downloads import find_pdf_url
+from ..core.events import ERROR, PROGRESS, ConsoleRenderer, EventBus
+from ..core.frontier import Frontier
+from ..core.records import PaperStore
+from ..core.retry import RetryPolicy
+from ..core.streaming import PartialFetcher
+
+
+# 详情页中摘要区块的位置标记：class/id 为 abstract，或 "Abstract" 标题
+_ABSTRACT_MARKER = re.compile(r"""(?:id|class)=["']abstract\b|>\s*Abstract\s*<""", re.IGNORECASE)
+# 完整的 PDF 链接：head 中的 citation_pdf_url 元数据，或 href 已闭合的 OpenReview / .pdf 链接（与 find_pdf_url 的规则一致）
+_PDF_LINK_MARKER = re.compile(
+	r"""<meta\b[^>]*citation_pdf_url[^>]*>|href=(["'])[^"']*(?:openreview\.net/(?:forum|pdf)[^"']*|\.pdf(?:\?[^"']*)?)\1""",
+	re.IGNORECASE,
+)
 
 
 class BaseScraper:
+	# 命中的论文是否需要通过 OpenAlex 补全引用数与 DOI（本身来自 OpenAlex 的来源不需要）
+	enrichable = True
+	# 抓取结果是否取决于关键词（如按关键词查询的 arXiv）：这类快照只在关键词相同时复用
+	keyword_query = False
+
 	def __init__(self, config):
 		self.config = config
 		self.keywords = config.get('keywords', [])
 		# 编译正则，提高匹配效率
 		self.keyword_patterns = [re.compile(re.escape(k), re.IGNORECASE) for k in self.keywords]
 		self.conference_name = "Base"
+		# 引擎会替换为所有爬虫共享的策略，使熔断与统计跨来源生效
+		self.retry_policy = RetryPolicy(config)
+		self.partial_fetcher = PartialFetcher(config)
+		# 扫描到的论文写入列式存储，引擎会替换为所有爬虫共享的存储
+		self.store = PaperStore()
+		# 进度、命中与错误都以事件形式输出，引擎会替换为共享的事件总线
+		self.events = EventBus([ConsoleRenderer()])
+		# 已从快照导入的年份：论文由引擎写入存储，不再抓取
+		self.loaded_years = set()
+		self._progress = {}
         
 	async def fetch(self, session, url):
-		"""通用的 HTTP GET 请求"""
+		"""通用的 HTTP GET 请求（临时失败按共享策略重试）"""
+		async def _read(response):
+			if response.status == 200:
+				return await response.text()
+			return None
+
+		try:
+			return await self.retry_policy.request(session, url, _read)
+		except Exception as e:
+			self.emit(ERROR, f"Error fetching {url}: {e}", url=url)
+			return None
+
+	async def fetch_partial(self, session, url):
+		"""流式读取详情页，details_complete 判断所需字段到齐后立即停止"""
+		if not self.partial_fetcher.enabled:
+			return await self.fetch(session, url)
 		try:
-			async with session.get(url, timeout=self.config.get('timeout', 30)) as response:
-				if response.status == 200:
-					return await response.text()
-				return None
+			return await self.partial_fetcher.fetch(session, url, self.details_complete, self.retry_policy)
 		except Exception as e:
-			print(f"Error fetching {url}: {e}")
+			self.emit(ERROR, f"Error fetching {url}: {e}", url=url)
 			return None
 
+	def find_abstract_node(self, soup):
+		"""返回详情页中摘要所在的节点，子类按页面结构覆盖"""
+		return soup.find(class_="abstract") or soup.find(id="abstract")
+
+	def details_complete(self, html):
+		"""citation_author / JSON-LD 位于 head，摘要节点闭合且已出现 PDF 链接后即视为字段齐全。
+
+		页面中没有 PDF 链接时会读完整页：PDF 链接只从已读到的 HTML 中解析，
+		提前停止会让下载阶段再请求一次落地页。
+		"""
+		if "</head>" not in html:
+			return False
+		if not _PDF_LINK_MARKER.search(html):
+			return False
+		marker = _ABSTRACT_MARKER.search(html)
+		if not marker:
+			return False
+		# 只解析摘要标记附近的片段，避免每个分块都重新解析整页
+		start = html.rfind("<", 0, marker.start())
+		node = self.find_abstract_node(BeautifulSoup(html[max(start, 0):], "html.parser"))
+		if node is None:
+			return False
+		last = node
+		for last in node.descendants:
+			pass
+		# 截断在摘要内部时，节点会一直延伸到文档末尾，之后不会再有元素
+		return last.find_next() is not None
+
+	def crawl_years(self):
+		"""需要抓取的年份（跳过已从快照导入的年份）"""
+		return [year for year in self.config.get("years", []) if year not in self.loaded_years]
+
 	def is_match(self, title, abstract):
 		"""检查标题或摘要是否命中任意关键词"""
 		for pattern in self.keyword_patterns:
@@ -28,6 +103,61 @@ class BaseScraper:
 				return True
 		return False
 
-	async def run(self, session):
-		"""子类必须实现此方法"""
+	def emit(self, kind, message=None, **fields):
+		"""发出带来源名的事件；只入队，不在事件循环上做 I/O"""
+		self.events.emit(kind, message, source=self.conference_name, **fields)
+
+	def _add_progress(self, year, total):
+		progress = self._progress.setdefault(year, [0, 0])
+		progress[1] += total
+		self.emit(PROGRESS, year=year, done=progress[0], total=progress[1])
+
+	def _advance_progress(self, year):
+		progress = self._progress.get(year)
+		if progress is not None:
+			progress[0] += 1
+			self.emit(PROGRESS, year=year, done=progress[0], total=progress[1])
+
+	def add_paper(self, year, title, authors, abstract, url, matched, pdf_url=None):
+		"""把扫描到的论文写入存储，返回行号"""
+		return self.store.append(self.conference_name, year, title, authors, abstract, url, matched, pdf_url)
+
+	def find_pdf_url(self, soup, page_url):
+		return find_pdf_url(soup, page_url)
+
+	def record_failure(self, year):
+		"""记录一个没有抓到的页面（请求失败或任务异常）；year 为 None 时计入所有抓取的年份。
+
+		有失败页面的来源-年份只是部分结果，不会导出为快照。
+		"""
+		for y in ([year] if year is not None else self.crawl_years()):
+			if y in self.stats:
+				self.stats[y]["failed"] = self.stats[y].get("failed", 0) + 1
+
+	async def process_detail(self, session, url, title, year):
+		"""前沿队列中的详情页任务：解析结果由 parse_paper_details 写入存储"""
+		try:
+			# 返回 None 表示详情页请求失败（网络错误或非 200）
+			if await self.parse_paper_details(session, url, title, year) is None:
+				self.record_failure(year)
+		finally:
+			self._advance_progress(year)
+
+	async def seed(self, frontier, session):
+		"""把列表/索引页作为种子放入前沿队列，子类必须实现此方法"""
 		raise NotImplementedError
+
+	def finish(self):
+		"""前沿队列清空后调用，用于输出汇总信息"""
+
+	async def run(self, session):
+		"""单独运行该爬虫：使用私有的前沿队列"""
+		frontier = Frontier(workers=self.config.get('concurrency', 20), events=self.events)
+		self.events.start()
+		try:
+			await self.seed(frontier, session)
+			await frontier.run()
+			self.finish()
+		finally:
+			self.events.close()
+		return list(self.store.matches()), self.stats
@@ -1,14 +1,38 @@
 import asyncio
+import os
 import random
+import re
 import json
+import time
 import aiohttp
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from bs4 import BeautifulSoup
-from tqdm import tqdm
 from .base import BaseScraper
+from ..core.events import ERROR, FOUND, LOG, STATS
+from ..core.frontier import LIST
+from ..core.retry import RetryableError
+
+
+OPENALEX_WORKS_URL = "https://api.openalex.org/works"
+
+
+async def query_works(retry_policy, session: aiohttp.ClientSession, params: Dict[str, Any]) -> Dict[str, Any]:
+	"""请求 OpenAlex /works 并解析 JSON；截断的响应视为临时失败交给共享策略重试"""
+	async def _read(resp):
+		resp.raise_for_status()
+		text = await resp.text()
+		try:
+			return json.loads(text)
+		except json.JSONDecodeError as e:
+			raise RetryableError(f"Invalid JSON from OpenAlex: {e}") from e
+
+	return await retry_policy.request(session, OPENALEX_WORKS_URL, _read, params=params)
 
 
 class OpenAlexScraper(BaseScraper):
+	# 期刊论文本身来自 OpenAlex，无需再补全
+	enrichable = False
+
 	def __init__(self, config, target: Dict[str, Any]):
 		super().__init__(config)
 		self.target = target
@@ -16,6 +40,8 @@ class OpenAlexScraper(BaseScraper):
 		self.issn = target.get("issn", "")
 		self.conference_name = self.source_name
 		self.stats = {year: {"scanned": 0, "found": 0} for year in self.config.get("years", [])}
+		# 出版商页面回填保持串行（每次请求前随机等待 3-5 秒），避免被封
+		self._fallback_slots = asyncio.Semaphore(1)
 
 	def _reconstruct_abstract(self, inverted: Dict[str, List[int]]) -> str:
 		if not inverted:
@@ -37,13 +63,17 @@ class OpenAlexScraper(BaseScraper):
 			"Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
 			"Accept-Language": "en-US,en;q=0.9",
 		}
+		async def _read(resp):
+			if resp.status != 200:
+				return None
+			return await resp.text()
+
 		try:
-			async with session.get(url, headers=headers, timeout=self.config.get("timeout", 30)) as resp:
-				if resp.status != 200:
-					return {"abstract": "", "authors": []}
-				html = await resp.text()
+			html = await self.retry_policy.request(session, url, _read, headers=headers)
 		except Exception:
-			return {"abstract": "", "authors": []}
+			html = None
+		if not html:
+			return {"abstract": "", "authors": [], "pdf_url": None}
 
 		soup = BeautifulSoup(html, "html.parser")
 		abstract = ""
@@ -76,93 +106,333 @@ class OpenAlexScraper(BaseScraper):
 			if author_list:
 				authors = [a.get_text(strip=True) for a in author_list if a.get_text(strip=True)]
 
-		return {"abstract": abstract, "authors": authors}
+		return {"abstract": abstract, "authors": authors, "pdf_url": self.find_pdf_url(soup, url)}
 
-	async def _fetch_page(self, session: aiohttp.ClientSession, year: int, cursor: str, retries: int = 3) -> Dict[str, Any]:
-		base_url = "https://api.openalex.org/works"
+	async def _fetch_page(self, session: aiohttp.ClientSession, year: int, cursor: str) -> Dict[str, Any]:
 		params = {
 			"filter": f"primary_location.source.issn:{self.issn},publication_year:{year}",
 			"per-page": 200,
 			"select": "title,publication_year,primary_location,authorships,abstract_inverted_index",
 			"cursor": cursor,
 		}
-		for attempt in range(retries):
-			async with session.get(base_url, params=params, timeout=self.config.get("timeout", 30)) as resp:
-				resp.raise_for_status()
-				text = await resp.text()
-				try:
-					return json.loads(text)
-				except json.JSONDecodeError:
-					if attempt == retries - 1:
-						raise
-					await asyncio.sleep(1 + attempt)
-		return {}
-
-	async def _fetch_year(self, session: aiohttp.ClientSession, year: int) -> List[Dict[str, Any]]:
-		results: List[Dict[str, Any]] = []
-		cursor = "*"
-		while True:
-			data = await self._fetch_page(session, year, cursor)
-			items = data.get("results", [])
-			if not items:
-				break
-			results.extend(items)
-			cursor = data.get("meta", {}).get("next_cursor")
-			if not cursor:
-				break
-		return results
+		return await query_works(self.retry_policy, session, params)
 
-	async def run(self, session: aiohttp.ClientSession):
-		all_results = []
+	async def seed(self, frontier, session: aiohttp.ClientSession):
 		years = self.config.get("years", [])
 		if not years:
-			print(f"[{self.source_name}] No years provided. Use --years to specify years.")
-			return [], self.stats
+			self.emit(ERROR, f"[{self.source_name}] No years provided. Use --years to specify years.")
+			return
 
-		for year in years:
-			print(f"[{self.source_name} {year}] Fetching from OpenAlex...")
-			items = await self._fetch_year(session, year)
+		for year in self.crawl_years():
+			self.emit(LOG, f"[{self.source_name} {year}] Fetching from OpenAlex...", year=year)
 			if year not in self.stats:
 				self.stats[year] = {"scanned": 0, "found": 0}
+			await frontier.put(self.process_page, frontier, session, year, "*", key=self._page_key(year, "*"), kind=LIST)
+
+	def _page_key(self, year: int, cursor: str) -> str:
+		return f"openalex:{self.issn}:{year}:{cursor}"
+
+	async def process_page(self, frontier, session: aiohttp.ClientSession, year: int, cursor: str):
+		data = await self._fetch_page(session, year, cursor)
+		items = data.get("results", [])
+		if not items:
+			return
+
+		# 游标分页只能顺序推进：先把下一页入队，再处理本页条目
+		next_cursor = data.get("meta", {}).get("next_cursor")
+		if next_cursor:
+			await frontier.put(
+				self.process_page, frontier, session, year, next_cursor,
+				key=self._page_key(year, next_cursor), kind=LIST,
+			)
+
+		self._add_progress(year, len(items))
+		for work in items:
+			title = work.get("title", "") or ""
+			abstract = self._reconstruct_abstract(work.get("abstract_inverted_index"))
+			authors = []
+			for auth in work.get("authorships", []) or []:
+				author = auth.get("author", {}) or {}
+				name = author.get("display_name")
+				if name:
+					authors.append(name)
+			location = work.get("primary_location") or {}
+			url = location.get("landing_page_url", "")
+			pdf_url = location.get("pdf_url")
 
-			for work in tqdm(items, desc=f"{self.source_name} {year}"):
-				title = work.get("title", "") or ""
-				abstract = self._reconstruct_abstract(work.get("abstract_inverted_index"))
-				authors = []
-				for auth in work.get("authorships", []) or []:
-					author = auth.get("author", {}) or {}
-					name = author.get("display_name")
-					if name:
-						authors.append(name)
-				authors_text = ", ".join(authors) if authors else "Unknown Authors"
-				url = (work.get("primary_location") or {}).get("landing_page_url", "")
-
-				self.stats[year]["scanned"] += 1
-				matched = self.is_match(title, abstract)
-				if matched and (not abstract or not authors) and url:
-					fallback = await self._fetch_doi_metadata(session, url)
-					if not abstract:
-						abstract = fallback.get("abstract", "")
-					if not authors:
-						authors = fallback.get("authors", [])
-					authors_text = ", ".join(authors) if authors else "Unknown Authors"
-					matched = self.is_match(title, abstract)
-
-				if matched:
-					self.stats[year]["found"] += 1
-					print(f"[{self.source_name} {year}] Found: {title[:50]}...")
-					all_results.append({
-						"source": self.source_name,
-						"year": year,
-						"title": title,
-						"authors": authors_text,
-						"abstract": abstract,
-						"url": url,
-					})
-
-			print(
+			self.stats[year]["scanned"] += 1
+			matched = self.is_match(title, abstract)
+			if matched and (not abstract or not authors) and url:
+				# 需要访问出版商页面回填，作为详情任务入队
+				await frontier.put(self.process_fallback, session, year, title, abstract, authors, url, pdf_url)
+				continue
+
+			self._advance_progress(year)
+			self._add_result(year, title, authors, abstract, url, matched, pdf_url)
+
+	async def process_fallback(
+		self, session: aiohttp.ClientSession, year: int, title: str, abstract: str, authors: List[str], url: str,
+		pdf_url: Optional[str] = None,
+	):
+		try:
+			async with self._fallback_slots:
+				fallback = await self._fetch_doi_metadata(session, url)
+		finally:
+			self._advance_progress(year)
+		if not abstract:
+			abstract = fallback.get("abstract", "")
+		if not authors:
+			authors = fallback.get("authors", [])
+		pdf_url = pdf_url or fallback.get("pdf_url")
+		self._add_result(year, title, authors, abstract, url, self.is_match(title, abstract), pdf_url)
+
+	def _add_result(
+		self, year: int, title: str, authors: List[str], abstract: str, url: str, matched: bool,
+		pdf_url: Optional[str] = None,
+	):
+		self.add_paper(year, title, authors, abstract, url, matched, pdf_url)
+		if matched:
+			self.stats[year]["found"] += 1
+			self.emit(FOUND, year=year, title=title, url=url)
+
+	def finish(self):
+		super().finish()
+		for year in self.config.get("years", []):
+			self.emit(
+				STATS,
 				f"[{self.source_name} {year}] Scanned {self.stats[year]['scanned']} papers, "
-				f"{self.stats[year]['found']} found matching keywords."
+				f"{self.stats[year]['found']} found matching keywords.",
+				year=year, **self.stats[year],
 			)
 
-		return all_results, self.stats
+
+_DOI_RE = re.compile(r"(10\.\d{4,9}/[^\s?#]+)", re.IGNORECASE)
+_ARXIV_RE = re.compile(r"arxiv\.org/(?:abs|pdf)/([^\s?#]+?)(?:v\d+)?(?:\.pdf)?$", re.IGNORECASE)
+# OR 过滤器的值以 | 分隔、过滤器之间以 , 分隔，标题中只保留字母数字
+_TITLE_TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+def normalize_title(title: str) -> str:
+	return " ".join(_TITLE_TOKEN_RE.findall((title or "").lower()))
+
+
+def paper_doi(paper) -> Optional[str]:
+	"""从论文 URL 推断 DOI：doi.org 链接，或 arXiv 条目对应的 10.48550/arXiv.<id>"""
+	url = paper.url or ""
+	arxiv = _ARXIV_RE.search(url)
+	if arxiv:
+		return f"10.48550/arxiv.{arxiv.group(1)}".lower()
+	if "doi.org/" in url:
+		match = _DOI_RE.search(url)
+		if match:
+			return match.group(1).lower()
+	return None
+
+
+class ResolutionCache:
+	"""本地解析缓存（JSON Lines，后写覆盖先写）：键为 doi:<doi> 或 title:<规范化标题>。
+
+	未能解析的结果同样缓存（值为 null），过期时间由 ttl_days 控制，过期后重新查询以刷新引用数。
+	"""
+
+	MISSING = object()
+
+	def __init__(self, path: str, ttl_days: float = 30):
+		self.path = path
+		self.ttl = ttl_days * 86400
+		self.entries = {}
+		if os.path.exists(path):
+			with open(path, "r", encoding="utf-8") as f:
+				for line in f:
+					line = line.strip()
+					if not line:
+						continue
+					try:
+						entry = json.loads(line)
+					except json.JSONDecodeError:
+						# 上次运行中断时可能留下半行
+						continue
+					self.entries[entry["key"]] = (entry["ts"], entry["value"])
+		self._pending = []
+
+	def get(self, key: str):
+		hit = self.entries.get(key)
+		if hit is None or time.time() - hit[0] > self.ttl:
+			return self.MISSING
+		return hit[1]
+
+	def put(self, key: str, value: Optional[Dict[str, Any]]):
+		ts = time.time()
+		self.entries[key] = (ts, value)
+		self._pending.append({"key": key, "ts": round(ts), "value": value})
+
+	def save(self):
+		if not self._pending:
+			return
+		folder = os.path.dirname(self.path)
+		if folder:
+			os.makedirs(folder, exist_ok=True)
+		with open(self.path, "a", encoding="utf-8") as f:
+			f.write("".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in self._pending))
+		self._pending = []
+
+
+class OpenAlexEnricher:
+	"""批量把命中的会议/arXiv 论文解析为 OpenAlex 作品，补全引用数、DOI 与 OpenAlex ID。
+
+	每个请求用 OR 过滤器（doi:a|b|... 或 title.search:"a"|"b"|...）一次解析一批论文，
+	select 只取需要的字段；请求经过共享的重试策略与 ClientSession。标题检索的结果可能
+	超过一页，按 cursor 翻页（最多 max_pages 页）。解析结果（包括未找到）写入本地缓存，
+	重复运行时不再请求；结果被截断的批次中未找到的标题不缓存。
+	"""
+
+	select = "id,doi,display_name,publication_year,cited_by_count"
+
+	def __init__(self, config, retry_policy, events):
+		settings = config.get("enrichment", {}) or {}
+		self.retry_policy = retry_policy
+		self.events = events
+		self.batch_size = max(1, min(int(settings.get("batch_size", 50)), 100))
+		self.concurrency = max(1, int(settings.get("concurrency", 4)))
+		self.max_pages = max(1, int(settings.get("max_pages", 5)))
+		self.mailto = settings.get("mailto")
+		self.cache = ResolutionCache(
+			settings.get("cache_file", os.path.join(".cache", "openalex_enrichment.jsonl")),
+			settings.get("ttl_days", 30),
+		)
+		self.stats = {"papers": 0, "cached": 0, "resolved": 0, "unresolved": 0, "requests": 0}
+
+	async def enrich(self, session: aiohttp.ClientSession, papers):
+		"""就地补全 papers 中每篇论文的 doi / openalex_id / cited_by"""
+		self.stats["papers"] += len(papers)
+		by_doi, by_title = {}, {}
+		for paper in papers:
+			doi = paper_doi(paper)
+			if doi:
+				paper.doi = doi
+				hit = self.cache.get(f"doi:{doi}")
+				if hit is not ResolutionCache.MISSING:
+					if hit is not None:
+						self._attach(paper, hit)
+						self.stats["cached"] += 1
+						continue
+				else:
+					by_doi.setdefault(doi, []).append(paper)
+					continue
+			self._queue_title(paper, by_title)
+
+		# 预算耗尽等中途退出时，已解析的结果照常写入缓存
+		try:
+			# DOI 查不到的论文（例如 OpenAlex 未收录 arXiv DOI）再按标题查
+			await self._run_batches(session, "doi", by_doi)
+			for doi, items in by_doi.items():
+				if not isinstance(self.cache.get(f"doi:{doi}"), dict):
+					for paper in items:
+						self._queue_title(paper, by_title)
+			await self._run_batches(session, "title", by_title)
+		finally:
+			self.cache.save()
+
+		self.events.emit(
+			STATS,
+			f"[Enrichment] {self.stats['papers']} papers: {self.stats['cached']} from cache, "
+			f"{self.stats['resolved']} resolved in {self.stats['requests']} requests, "
+			f"{self.stats['unresolved']} unresolved.",
+			scope="enrichment", **self.stats,
+		)
+		return self.stats
+
+	def _queue_title(self, paper, by_title: Dict[str, list]):
+		title = normalize_title(paper.title)
+		hit = self.cache.get(f"title:{title}") if title else None
+		if hit is ResolutionCache.MISSING:
+			by_title.setdefault(title, []).append(paper)
+		elif hit is not None:
+			self._attach(paper, hit)
+			self.stats["cached"] += 1
+		else:
+			self.stats["unresolved"] += 1
+
+	async def _run_batches(self, session, field: str, pending: Dict[str, list]):
+		keys = list(pending)
+		batches = [keys[i:i + self.batch_size] for i in range(0, len(keys), self.batch_size)]
+		slots = asyncio.Semaphore(self.concurrency)
+
+		async def _one(batch):
+			async with slots:
+				await self._resolve_batch(session, field, batch, pending)
+
+		await asyncio.gather(*(_one(batch) for batch in batches))
+
+	async def _resolve_batch(self, session, field: str, batch: List[str], pending: Dict[str, list]):
+		if field == "doi":
+			value = "|".join(f"https://doi.org/{doi}" for doi in batch)
+			params = {"filter": f"doi:{value}", "per-page": len(batch)}
+		else:
+			value = "|".join(f'"{title}"' for title in batch)
+			params = {"filter": f"title.search:{value}", "per-page": 200}
+		params["select"] = self.select
+		params["cursor"] = "*"
+		if self.mailto:
+			params["mailto"] = self.mailto
+
+		works = []
+		truncated = False
+		for page in range(self.max_pages):
+			self.stats["requests"] += 1
+			try:
+				data = await query_works(self.retry_policy, session, params)
+			except Exception as e:
+				# 请求失败时不写缓存，下次运行重新查询
+				self.events.emit(ERROR, f"[Enrichment] OpenAlex {field} batch failed: {e}")
+				if field == "title":
+					self.stats["unresolved"] += sum(len(pending[key]) for key in batch)
+				return
+			results = data.get("results", []) or []
+			works.extend(results)
+			meta = data.get("meta", {}) or {}
+			count, cursor = meta.get("count"), meta.get("next_cursor")
+			if not results or not cursor or (count is not None and len(works) >= count):
+				break
+			params = dict(params, cursor=cursor)
+		else:
+			# 翻到 max_pages 页仍有结果：没找到的标题可能只是排在后面
+			truncated = True
+
+		found = {}
+		for work in works:
+			record = {
+				"openalex_id": (work.get("id") or "").rsplit("/", 1)[-1] or None,
+				"doi": (work.get("doi") or "").replace("https://doi.org/", "").lower() or None,
+				"cited_by": work.get("cited_by_count"),
+				"year": work.get("publication_year"),
+			}
+			key = record["doi"] if field == "doi" else normalize_title(work.get("display_name", ""))
+			if key in pending:
+				found.setdefault(key, []).append(record)
+
+		for key in batch:
+			items = pending[key]
+			record = self._best(found.get(key), items[0].year)
+			if record is not None or not truncated:
+				self.cache.put(f"{field}:{key}", record)
+			if record is None:
+				if field == "title":
+					self.stats["unresolved"] += len(items)
+				continue
+			for paper in items:
+				self._attach(paper, record)
+				self.stats["resolved"] += 1
+
+	@staticmethod
+	def _best(records, year):
+		"""同名作品（预印本与正式版本）优先取年份一致的，其次取引用数最多的"""
+		if not records:
+			return None
+		return max(records, key=lambda r: (r.get("year") == year, r.get("cited_by") or 0))
+
+	@staticmethod
+	def _attach(paper, record):
+		paper.openalex_id = record.get("openalex_id")
+		paper.doi = record.get("doi") or paper.doi
+		paper.cited_by = record.get("cited_by")
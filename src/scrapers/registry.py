@@ -0,0 +1,99 @@
+"""数据源注册表：各来源在此声明名称、别名与 ISSN，只有被选中时才导入对应模块。"""
+import importlib
+
+
+def slug_name(text):
+	return "-".join(text.lower().split())
+
+
+class SourceSpec:
+	"""一个可选数据源的声明；module/class_name 在 create 时才导入"""
+
+	__slots__ = ("name", "module", "class_name", "kind", "aliases", "issn", "target")
+
+	def __init__(self, name, module, class_name, kind, aliases=(), issn=None, target=None):
+		self.name = name
+		self.module = module
+		self.class_name = class_name
+		self.kind = kind
+		self.aliases = tuple(aliases)
+		self.issn = issn
+		self.target = target
+
+	def load(self):
+		return getattr(importlib.import_module(self.module, __package__), self.class_name)
+
+	def create(self, config):
+		cls = self.load()
+		if self.target is not None:
+			return cls(config, self.target)
+		return cls(config)
+
+	def __repr__(self):
+		return f"SourceSpec({self.name!r}, {self.kind!r})"
+
+
+_SOURCES = {}
+_LOOKUP = {}
+
+
+def register(name, module, class_name, kind="conference", aliases=(), issn=None, target=None):
+	"""声明一个数据源；同名重复注册时覆盖旧声明（例如 config.yaml 中的 targets）"""
+	spec = SourceSpec(name, module, class_name, kind, aliases, issn, target)
+	_SOURCES[name] = spec
+	for token in (name, *aliases, issn):
+		if token:
+			_LOOKUP[token.lower()] = spec
+	return spec
+
+
+def register_journal(name, issn, aliases=()):
+	"""按 ISSN 通过 OpenAlex 抓取的期刊"""
+	return register(
+		slug_name(name), ".openalex", "OpenAlexScraper", kind="journal",
+		aliases=aliases, issn=issn, target={"name": name, "issn": issn},
+	)
+
+
+def register_targets(targets):
+	"""把 config.yaml 中的 targets 注册为期刊来源，已声明的 ISSN（如 arXiv）保持不变"""
+	for target in targets or []:
+		name = target.get("name", "")
+		issn = (target.get("issn", "") or "").lower()
+		existing = _LOOKUP.get(issn) or _LOOKUP.get(slug_name(name))
+		if existing is not None and existing.target is None:
+			continue
+		aliases = existing.aliases if existing is not None else ()
+		register_journal(name, target.get("issn", ""), aliases=aliases)
+
+
+def lookup(token):
+	"""按名称、别名或 ISSN 查找来源，找不到返回 None"""
+	return _LOOKUP.get((token or "").lower())
+
+
+def resolve(tokens):
+	"""解析一组来源名称，返回 (去重后的来源声明, 无法识别的名称)"""
+	specs, unknown = [], []
+	for token in tokens or []:
+		spec = lookup(token)
+		if spec is None:
+			unknown.append(token)
+		elif spec not in specs:
+			specs.append(spec)
+	return specs, unknown
+
+
+def available(kind=None):
+	return [spec for spec in _SOURCES.values() if kind is None or spec.kind == kind]
+
+
+register("icml", ".icml", "ICMLScraper")
+register("neurips", ".neurips", "NeurIPSScraper")
+register("iclr", ".iclr", "ICLRScraper")
+register("arxiv", ".arxiv", "ArxivScraper", kind="preprint", issn="arxiv")
+register_journal("Nature Machine Intelligence", "2522-5839", aliases=("nmi",))
+register_journal("Nature Computational Science", "2662-8457", aliases=("ncs",))
+register_journal("npj Quantum Information", "2056-6387", aliases=("npjqi",))
+register_journal("Physical Review Letters", "0031-9007", aliases=("prl",))
+register_journal("Quantum", "2521-327X")
@@ -0,0 +1,62 @@
+"""前沿队列的背压：worker 启动前批量入队不能阻塞，运行中详情队列满时等待"""
+import asyncio
+
+from src.core.frontier import DETAIL, LIST, Frontier
+
+
+def test_put_before_run_does_not_block():
+	async def scenario():
+		done = []
+
+		async def task(i):
+			done.append(i)
+
+		frontier = Frontier(workers=4, max_pending=10)
+		for i in range(25):
+			await asyncio.wait_for(frontier.put(task, i, key=i), 1)
+		await asyncio.wait_for(frontier.run(), 5)
+		return done
+
+	assert sorted(asyncio.run(scenario())) == list(range(25))
+
+
+def test_backpressure_while_running():
+	async def scenario():
+		peak = 0
+		done = []
+
+		async def detail(frontier, i):
+			nonlocal peak
+			peak = max(peak, len(frontier._queues[DETAIL]))
+			await asyncio.sleep(0)
+			done.append(i)
+
+		async def listing(frontier):
+			# worker 中入队：队列满时等待其他 worker 取走任务
+			for i in range(50):
+				await frontier.put(detail, frontier, i, key=i)
+
+		frontier = Frontier(workers=3, max_pending=5)
+		await frontier.put(listing, frontier, key="list", kind=LIST)
+		await asyncio.wait_for(frontier.run(), 5)
+		return peak, done
+
+	peak, done = asyncio.run(scenario())
+	assert sorted(done) == list(range(50))
+	assert peak <= 5
+
+
+def test_duplicate_keys_are_ignored():
+	async def scenario():
+		async def task():
+			pass
+
+		frontier = Frontier(workers=1)
+		assert await frontier.put(task, key="a")
+		assert not await frontier.put(task, key="a")
+		assert frontier.seen("a")
+		await frontier.run()
+		return frontier.stats
+
+	stats = asyncio.run(scenario())
+	assert stats["enqueued"] == 1 and stats["duplicates"] == 1
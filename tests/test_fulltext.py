@@ -0,0 +1,53 @@
+"""全文匹配与 PDF 下载的批量入队：超过前沿队列 max_pending（1000）的论文数不能死锁"""
+import asyncio
+
+from src.core.downloads import PDFDownloader
+from src.core.events import EventBus
+from src.core.fulltext import FullTextMatcher
+from src.core.records import Paper, PaperStore
+from src.core.retry import RetryPolicy
+
+ROWS = 1300
+
+
+def _config(tmp_path):
+	return {
+		"keywords": ["quantum"],
+		"output_dir": str(tmp_path),
+		"concurrency": 4,
+		"fulltext": {"cache_dir": str(tmp_path / "fulltext"), "workers": 1},
+	}
+
+
+async def _no_pdf(session, paper):
+	await asyncio.sleep(0)
+	return None
+
+
+def test_fulltext_match_with_many_rows(tmp_path):
+	store = PaperStore()
+	for i in range(ROWS):
+		store.append("ICML", 2024, f"Title {i}", [], "", f"https://icml.cc/p/{i}")
+	config = _config(tmp_path)
+	matcher = FullTextMatcher(config, RetryPolicy(config), EventBus([]))
+	matcher.downloader.download_paper = _no_pdf
+
+	matched = asyncio.run(asyncio.wait_for(matcher.match(None, store, []), 30))
+	assert matched == 0
+	assert matcher.stats["candidates"] == ROWS
+	assert matcher.stats["no_pdf"] == ROWS
+
+
+def test_download_with_many_papers(tmp_path):
+	config = _config(tmp_path)
+	downloader = PDFDownloader(config, RetryPolicy(config), EventBus([]))
+	calls = []
+
+	async def fake_download(session, paper):
+		calls.append(paper)
+		return None
+
+	downloader.download_paper = fake_download
+	papers = [Paper("ICML", 2024, f"Title {i}", [], "", f"https://icml.cc/p/{i}") for i in range(ROWS)]
+	asyncio.run(asyncio.wait_for(downloader.download(None, papers), 30))
+	assert len(calls) == ROWS
@@ -0,0 +1,69 @@
+"""OpenAlex 批量补全：标题检索按 cursor 翻页，截断批次中未找到的标题不缓存，中途退出时照常保存缓存"""
+import asyncio
+
+import pytest
+
+from src.core.budget import BudgetExceeded
+from src.core.events import EventBus
+from src.core.records import Paper
+from src.scrapers import openalex
+from src.scrapers.openalex import OpenAlexEnricher, ResolutionCache
+
+PAGES = 3
+
+
+def _work(i, title):
+	return {"id": f"https://openalex.org/W{i}", "doi": None, "display_name": title, "publication_year": 2024, "cited_by_count": i}
+
+
+@pytest.fixture
+def works(monkeypatch):
+	"""每页一个作品：前两页是同名检索的其他结果，目标标题在第三页"""
+	calls = []
+
+	async def query_works(retry_policy, session, params):
+		calls.append(params["cursor"])
+		page = 0 if params["cursor"] == "*" else int(params["cursor"])
+		title = "Quantum Paper" if page == PAGES - 1 else f"Quantum Paper Extended {page}"
+		cursor = str(page + 1) if page + 1 < PAGES else None
+		return {"meta": {"count": PAGES, "next_cursor": cursor}, "results": [_work(page, title)]}
+
+	monkeypatch.setattr(openalex, "query_works", query_works)
+	return calls
+
+
+def _enrich(tmp_path, max_pages):
+	config = {"enrichment": {"cache_file": str(tmp_path / "cache.jsonl"), "max_pages": max_pages}}
+	enricher = OpenAlexEnricher(config, None, EventBus([]))
+	papers = [Paper("ICML", 2024, "Quantum paper", [], "", "https://icml.cc/p/1")]
+	asyncio.run(enricher.enrich(None, papers))
+	return enricher, papers[0]
+
+
+def test_title_batch_follows_cursor(tmp_path, works):
+	enricher, paper = _enrich(tmp_path, max_pages=5)
+	assert works == ["*", "1", "2"]
+	assert paper.openalex_id == "W2" and enricher.stats["resolved"] == 1
+
+
+def test_truncated_batch_does_not_cache_misses(tmp_path, works):
+	enricher, paper = _enrich(tmp_path, max_pages=2)
+	assert paper.openalex_id is None and enricher.stats["unresolved"] == 1
+	cache = ResolutionCache(str(tmp_path / "cache.jsonl"))
+	assert cache.get("title:quantum paper") is ResolutionCache.MISSING
+
+
+def test_cache_is_saved_when_budget_runs_out(tmp_path, monkeypatch):
+	async def query_works(retry_policy, session, params):
+		if params["filter"].startswith("doi:"):
+			return {"meta": {"count": 0}, "results": []}
+		raise BudgetExceeded("max_requests")
+
+	monkeypatch.setattr(openalex, "query_works", query_works)
+	config = {"enrichment": {"cache_file": str(tmp_path / "cache.jsonl")}}
+	enricher = OpenAlexEnricher(config, None, EventBus([]))
+	papers = [Paper("arXiv", 2024, "Quantum paper", [], "", "http://arxiv.org/abs/2401.00001v1")]
+	with pytest.raises(BudgetExceeded):
+		asyncio.run(enricher.enrich(None, papers))
+	cache = ResolutionCache(str(tmp_path / "cache.jsonl"))
+	assert cache.get("doi:10.48550/arxiv.2401.00001") is None
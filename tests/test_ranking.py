@@ -0,0 +1,30 @@
+"""向量化分词的词频：必须与逐行按完整词计数一致，行与行之间没有分隔字节时也不能跨行匹配"""
+import random
+import re
+
+import pytest
+
+from src.core.ranking import _FieldIndex
+from src.core.records import TextColumn
+
+WORDS = ["ab", "abc", "abcd", "abcde", "abcdefgh", "abcdefghi", "Quantum", "quantumx", "naïve", "é", "x"]
+
+
+def _expected(texts, term):
+	pattern = re.compile(rf"(?<![0-9a-z\u0080-\U0010ffff]){re.escape(term)}(?![0-9a-z\u0080-\U0010ffff])")
+	return [len(pattern.findall(text.lower())) for text in texts]
+
+
+@pytest.mark.parametrize("term", ["ab", "abc", "abcd", "abcde", "abcdefgh", "abcdefghi", "quantum", "naïve", "é", "x"])
+def test_term_frequency_matches_whole_words(term):
+	rng = random.Random(0)
+	texts = ["", "abc", "abcd", "ab"]
+	for _ in range(500):
+		# 分隔符可能为空：相邻两个词拼在一起，行尾的词紧挨着下一行的行首
+		texts.append("".join(rng.choice(WORDS) + rng.choice(["", " ", ", ", "-"]) for _ in range(rng.randint(0, 8))))
+	column = TextColumn()
+	for text in texts:
+		column.append(text)
+	index = _FieldIndex(column)
+	assert index.term_frequency(term).tolist() == _expected(texts, term)
+	assert index.lengths.tolist() == [len(re.findall(r"[0-9a-z\u0080-\U0010ffff]+", text.lower())) for text in texts]
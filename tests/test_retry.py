@@ -0,0 +1,68 @@
+"""熔断器的半开状态：冷却结束后只放行一个探测请求，探测失败立即重新熔断"""
+import asyncio
+
+from src.core.retry import CircuitBreaker
+
+
+def _breaker():
+	breaker = CircuitBreaker(threshold=2, cooldown=0.05)
+	breaker.events = None
+	return breaker
+
+
+def _trip(breaker, host):
+	breaker.record_failure(host)
+	assert breaker.record_failure(host)
+
+
+def test_half_open_admits_one_probe(capsys):
+	async def scenario():
+		breaker = _breaker()
+		_trip(breaker, "h")
+		waiters = [asyncio.create_task(breaker.wait("h")) for _ in range(5)]
+		await asyncio.sleep(0.08)
+		probes = [task.result() for task in waiters if task.done()]
+		assert len(probes) == 1 and probes[0] is not None
+
+		# 探测失败：立即重新熔断，其余请求继续等待
+		assert breaker.record_failure("h")
+		await asyncio.sleep(0.05)
+		assert sum(task.done() for task in waiters) == 1
+
+		await asyncio.sleep(0.1)
+		probes = [task for task in waiters if task.done() and task.result() is not None]
+		assert len(probes) == 2
+
+		# 探测成功：host 恢复，所有等待的请求放行且不再是探测
+		breaker.record_success("h")
+		results = await asyncio.wait_for(asyncio.gather(*waiters), 1)
+		assert sum(result is not None for result in results) == 2
+		assert await breaker.wait("h") is None
+
+	asyncio.run(scenario())
+
+
+def test_released_probe_passes_to_next_waiter(capsys):
+	async def scenario():
+		breaker = _breaker()
+		_trip(breaker, "h")
+		await asyncio.sleep(0.06)
+		probe = await breaker.wait("h")
+		assert probe is not None
+		waiter = asyncio.create_task(breaker.wait("h"))
+		await asyncio.sleep(0.01)
+		assert not waiter.done()
+
+		# 探测没有得出结果（如被取消）：下一个等待者成为新的探测
+		breaker.release("h", probe)
+		assert await asyncio.wait_for(waiter, 1) is not None
+
+	asyncio.run(scenario())
+
+
+def test_failures_below_threshold_do_not_trip():
+	breaker = _breaker()
+	assert not breaker.record_failure("h")
+	breaker.record_success("h")
+	assert not breaker.record_failure("h")
+	assert "h" not in breaker.open_until
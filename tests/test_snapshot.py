@@ -0,0 +1,105 @@
+"""快照的写入与内存映射读取：按行、顺序读取与关键词查询必须还原全部论文"""
+import pytest
+
+from src.core.records import PaperStore
+from src.core.snapshot import BLOCK_ROWS, Snapshot, write_snapshot
+
+
+def _store(count, pdf_until=None):
+	store = PaperStore()
+	for i in range(count):
+		store.append(
+			"ICML", 2024,
+			f"Title {i}" + (" quantum" if i % 7 == 0 else ""),
+			[f"Author {i % 13}", "Shared Author"] if i % 5 else [],
+			f"Abstract {i} é" if i % 3 else "",
+			f"https://icml.cc/virtual/2024/poster/{i}",
+			pdf_url=f"https://openreview.net/pdf?id={i}" if pdf_until is None or i < pdf_until else None,
+		)
+	return store
+
+
+@pytest.mark.parametrize("count, pdf_until", [
+	(0, None),
+	(1, None),
+	(BLOCK_ROWS, None),
+	(300, None),
+	# 最后一个不满的块中 pdf_urls 全为空字符串
+	(300, BLOCK_ROWS),
+	(2 * BLOCK_ROWS + 1, 0),
+])
+def test_round_trip(tmp_path, count, pdf_until):
+	store = _store(count, pdf_until)
+	path = tmp_path / "icml_2024.ptsnap"
+	rows = list(range(len(store)))
+	write_snapshot(str(path), store, rows, "ICML", 2024)
+
+	expected = [store[row].to_dict() for row in rows]
+	with Snapshot(str(path)) as snapshot:
+		assert (snapshot.source, snapshot.year, len(snapshot)) == ("ICML", 2024, count)
+		assert [paper.to_dict() for paper in snapshot] == expected
+		assert [snapshot[row].to_dict() for row in reversed(rows)] == expected[::-1]
+
+		loaded = list(snapshot.rows())
+		assert len(loaded) == count
+		for (title, authors, abstract, url, pdf_url), row in zip(loaded, rows):
+			assert title == store.titles[row]
+			assert authors == store.authors(row)
+			assert abstract == store.abstracts[row]
+			assert url == store.urls[row]
+			assert pdf_url == store.pdf_urls[row]
+
+		matched = [paper.title for paper in snapshot.matches(["QUANTUM"])]
+		assert matched == [store.titles[row] for row in rows if row % 7 == 0]
+
+
+def test_selected_rows(tmp_path):
+	store = _store(40)
+	rows = list(range(5, 40, 3))
+	path = tmp_path / "subset.ptsnap"
+	write_snapshot(str(path), store, rows, "ICML", 2024)
+	with Snapshot(str(path)) as snapshot:
+		assert [paper.to_dict() for paper in snapshot] == [store[row].to_dict() for row in rows]
+
+
+def test_rejects_bad_files(tmp_path):
+	path = tmp_path / "bad.ptsnap"
+	path.write_bytes(b"not a snapshot at all, just some bytes")
+	with pytest.raises(ValueError):
+		Snapshot(str(path))
+	path.write_bytes(b"")
+	with pytest.raises(ValueError):
+		Snapshot(str(path))
+
+
+def test_years_with_failed_pages_are_not_exported(tmp_path):
+	import asyncio
+
+	from src.core.engine import CrawlerEngine
+	from src.scrapers.icml import ICMLScraper
+
+	class FlakyICML(ICMLScraper):
+		async def parse_paper_details(self, session, url, title, year):
+			# 2024 年的一个详情页请求失败
+			if url.endswith("/3") and year == 2024:
+				return None
+			self.stats[year]["scanned"] += 1
+			self.add_paper(year, title, [], "", url, False)
+			return False
+
+	config = {
+		"keywords": ["quantum"], "years": [2023, 2024], "console": False, "output_dir": str(tmp_path),
+		"snapshots": {"export_dir": str(tmp_path / "snaps")},
+	}
+	scraper = FlakyICML(config)
+	engine = CrawlerEngine([scraper], config)
+
+	async def crawl():
+		for year in (2023, 2024):
+			for i in range(5):
+				await scraper.process_detail(None, f"https://icml.cc/virtual/{year}/poster/{i}", f"T{i}", year)
+
+	asyncio.run(crawl())
+	assert scraper.stats[2024]["failed"] == 1 and "failed" not in scraper.stats[2023]
+	engine._export_snapshots({"ICML": scraper.stats})
+	assert sorted(p.name for p in (tmp_path / "snaps").iterdir()) == ["icml_2023.ptsnap"]
@@ -0,0 +1,66 @@
+"""流式读取的节省统计：按线上字节计，压缩响应取不到压缩字节数时记为未知，耗时只计读取响应体"""
+import asyncio
+
+from src.core.streaming import PartialFetcher
+
+BODY = b"<html><head></head><body>" + b"x" * 4000 + b"<p>done</p>" + b"y" * 60000 + b"</body></html>"
+
+
+class _Content:
+	def __init__(self, body, raw_bytes):
+		self.body = body
+		if raw_bytes is not None:
+			self.total_raw_bytes = raw_bytes
+
+	async def iter_chunked(self, size):
+		for start in range(0, len(self.body), size):
+			yield self.body[start:start + size]
+
+
+class _Response:
+	status = 200
+	charset = "utf-8"
+
+	def __init__(self, headers, raw_bytes=None):
+		self.headers = headers
+		self.content = _Content(BODY, raw_bytes)
+
+
+class _Policy:
+	budget = None
+
+	def __init__(self, response):
+		self.response = response
+
+	async def request(self, session, url, read, headers=None):
+		# 排队、退避与首字节等待不属于读取响应体的时间
+		await asyncio.sleep(0.2)
+		return await read(self.response)
+
+
+def _fetch(response):
+	fetcher = PartialFetcher({"streaming": {"chunk_size": 1024}})
+	text = asyncio.run(fetcher.fetch(None, "https://icml.cc/p/1", lambda html: "done" in html, _Policy(response)))
+	assert "done" in text
+	return fetcher.stream_stats
+
+
+def test_plain_response_savings():
+	stats = _fetch(_Response({"Content-Length": str(len(BODY))}))
+	s = stats.stats
+	assert s["early_stops"] == 1 and s["wire_bytes"] == s["bytes_read"] == 4096
+	assert s["bytes_skipped"] == len(BODY) - 4096
+	assert s["read_seconds"] < 0.1
+
+
+def test_compressed_response_uses_wire_bytes():
+	stats = _fetch(_Response({"Content-Encoding": "gzip", "Content-Length": "3000"}, raw_bytes=1200))
+	s = stats.stats
+	assert s["wire_bytes"] == 1200 and s["bytes_skipped"] == 1800 and s["unmeasured"] == 0
+
+
+def test_compressed_response_without_wire_bytes_is_unknown():
+	stats = _fetch(_Response({"Content-Encoding": "gzip", "Content-Length": "3000"}))
+	s = stats.stats
+	assert s["bytes_skipped"] == 0 and s["unmeasured"] == 1 and s["measured_pages"] == 0
+	assert "savings unknown for 1 compressed pages" in stats.summary()
@@ -0,0 +1,97 @@
+"""共享任务队列的租约语义：过期租约被其他 worker 重新领取，迟到的确认不生效，重复写入的论文合并时去重"""
+import json
+import time
+
+from src.core.frontier import DETAIL, LIST
+from src.core.workqueue import WorkQueue
+
+
+def _paper(title, url, matched=True):
+	return ("ICML", 2024, title, ["Alice"], "An abstract.", url, matched, None)
+
+
+def test_lease_order_and_dedup(tmp_path):
+	queue = WorkQueue(str(tmp_path / "queue.db"))
+	assert queue.put("detail-1", "ICML", "process_detail", "[]", DETAIL)
+	assert queue.put("list-1", "ICML", "process_list", "[]", LIST)
+	assert not queue.put("detail-1", "ICML", "process_detail", "[]", DETAIL)
+	assert queue.seen("detail-1") and not queue.seen("detail-2")
+
+	# 列表页优先领取；已被领取的任务不会再次发给其他 worker
+	assert [item[0] for item in queue.lease("a", 1)] == ["list-1"]
+	assert [item[0] for item in queue.lease("b", 5)] == ["detail-1"]
+	assert queue.lease("c", 5) == []
+	queue.close()
+
+
+def test_expired_lease_is_released(tmp_path):
+	queue = WorkQueue(str(tmp_path / "queue.db"), lease_seconds=0.05, max_attempts=3)
+	queue.put("task", "ICML", "process_detail", "[]")
+	assert [item[0] for item in queue.lease("crashed", 1)] == ["task"]
+	assert queue.lease("other", 1) == []
+
+	time.sleep(0.1)
+	assert [item[0] for item in queue.lease("other", 1)] == ["task"]
+	assert queue.counts()["leased"] == 1
+
+	# 原 worker 迟到的确认与论文：确认不生效，论文照常写入，合并时去重
+	queue.commit("crashed", ["task"], [], [_paper("Paper", "https://icml.cc/p/1")], None)
+	assert queue.counts() == {"pending": 0, "leased": 1, "done": 0, "failed": 0}
+	queue.commit("other", ["task"], [], [_paper("Paper", "https://icml.cc/p/1")], None)
+	queue.commit("other", ["task"], [], [], None)
+	assert queue.counts() == {"pending": 0, "leased": 0, "done": 1, "failed": 0}
+
+	store = queue.load_store()
+	assert len(store) == 1
+	assert store[0].title == "Paper" and store.matched[0] == 1
+	queue.close()
+
+
+def test_expired_lease_fails_after_max_attempts(tmp_path):
+	queue = WorkQueue(str(tmp_path / "queue.db"), lease_seconds=0.05, max_attempts=2)
+	queue.set_meta("seeded", True)
+	queue.put("task", "ICML", "process_detail", "[]")
+	for worker in ("a", "b"):
+		assert len(queue.lease(worker, 1)) == 1
+		time.sleep(0.1)
+	assert queue.lease("c", 1) == []
+	assert queue.counts()["failed"] == 1
+	assert queue.drained()
+	queue.close()
+
+
+def test_failed_task_returns_to_queue(tmp_path):
+	queue = WorkQueue(str(tmp_path / "queue.db"), max_attempts=3)
+	queue.put("task", "ICML", "process_detail", "[]")
+	queue.lease("a", 1)
+	queue.commit("a", [], [("task", "boom")], [], {"network": {"requests": 1}})
+	assert queue.counts()["pending"] == 1
+	assert queue.shard_stats() == {"a": {"network": {"requests": 1}}}
+	assert [item[0] for item in queue.lease("b", 1)] == ["task"]
+	queue.close()
+
+
+def test_merge_marks_only_years_with_outstanding_tasks(tmp_path):
+	from src.core.engine import CrawlerEngine
+	from src.scrapers.icml import ICMLScraper
+
+	config = {
+		"keywords": ["quantum"], "years": [2023, 2024, 2025], "console": False,
+		"output_dir": str(tmp_path), "queue_path": str(tmp_path / "queue.db"),
+	}
+	engine = CrawlerEngine([ICMLScraper(config)], config)
+	queue = engine.queue
+	for key, year in (("done-2023", 2023), ("left-2024", 2024), ("failed-2025", 2025)):
+		queue.put(key, "ICML", "process_detail", json.dumps(["<session>", f"https://icml.cc/{key}", "T", year]))
+	queue.lease("a", 3)
+	queue.commit("a", ["done-2023"], [], [_paper("Paper", "https://icml.cc/p/1")], {
+		# 分片 a 截止时 2023 还没做完，但任务随后已由其他进程完成
+		"incomplete": [["ICML", 2023, "deadline"], ["ICML", 2024, "deadline"]],
+	})
+	queue._db.execute("UPDATE tasks SET state = 'failed' WHERE key = 'failed-2025'")
+
+	stats = engine._merge_shards()["ICML"]
+	assert "incomplete" not in stats[2023]
+	assert stats[2024]["incomplete"] == "deadline"
+	assert stats[2025]["incomplete"] == "failed"
+	queue.close()